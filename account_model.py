@@ -0,0 +1,187 @@
+import time
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from cookies import COOKIE_EXPIRED, COOKIE_EXPIRING_SOON, COOKIE_MALFORMED, COOKIE_MISSING, classify_sso_cookie
+from parsing import PROVIDER_FIELDS
+
+COLUMN_EMAIL = 0
+COLUMN_STATUS = 1
+COLUMN_PLATFORM = 2
+COLUMN_EXPIRY = 3
+COLUMN_TITLES = ("Email", "Status", "Platform", "Cookie Expires")
+
+
+def account_platform(account):
+    if account.platform:
+        return account.platform
+    return ", ".join([name for name, field in PROVIDER_FIELDS.items() if getattr(account, field, None)])
+
+
+def expiry_text(state, expires_at):
+    if state == COOKIE_MISSING:
+        return "No cookie"
+    if state == COOKIE_MALFORMED:
+        return "Malformed"
+    text = time.strftime("%Y-%m-%d %H:%M", time.localtime(expires_at))
+    if state == COOKIE_EXPIRED:
+        return f"Expired {text}"
+    if state == COOKIE_EXPIRING_SOON:
+        return f"{text} (soon)"
+    return text
+
+
+class AccountRow:
+    __slots__ = ("email", "status", "platform", "sso_cookie", "warning_seconds", "_cookie", "_search")
+
+    def __init__(self, account, warning_seconds):
+        # Cookie decoding and the search text are deferred until a sort, filter or paint needs them
+        self.email = account.email
+        self.status = (account.last_status or "Not checked").partition("\n")[0]
+        self.platform = account_platform(account)
+        self.sso_cookie = account.sso_cookie
+        self.warning_seconds = warning_seconds
+        self._cookie = None
+        self._search = None
+
+    @property
+    def cookie(self):
+        if self._cookie is None:
+            self._cookie = classify_sso_cookie(self.sso_cookie, self.warning_seconds)
+        return self._cookie
+
+    @property
+    def expires_at(self):
+        # Missing and malformed cookies sort before expired ones
+        expires_at = self.cookie[1]
+        return -1 if expires_at is None else expires_at
+
+    @property
+    def search(self):
+        if self._search is None:
+            self._search = f"{self.email}\n{self.status}\n{self.platform}".lower()
+        return self._search
+
+    def values(self):
+        return (self.email, self.status, self.platform, expiry_text(*self.cookie))
+
+
+SORT_KEYS = {
+    COLUMN_EMAIL: lambda row: row.email.lower(),
+    COLUMN_STATUS: lambda row: row.status,
+    COLUMN_PLATFORM: lambda row: row.platform,
+    COLUMN_EXPIRY: lambda row: row.expires_at,
+}
+
+
+class AccountTableModel(QAbstractTableModel):
+    def __init__(self, accounts, warning_seconds, parent=None):
+        # Rows are cached display values; only rows the view asks for are ever formatted
+        super().__init__(parent)
+        self.accounts = accounts
+        self.warning_seconds = warning_seconds
+        self._rows_by_email = {}
+        self._visible = []
+        self._position = {}
+        self._filter = ""
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_TITLES)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._visible[index.row()]
+        if role == Qt.DisplayRole:
+            return row.values()[index.column()]
+        if role == Qt.ToolTipRole and index.column() == COLUMN_STATUS:
+            return row.status
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMN_TITLES[section]
+        return None
+
+    def email_at(self, index):
+        if not index.isValid() or index.row() >= len(self._visible):
+            return None
+        return self._visible[index.row()].email
+
+    def reset(self):
+        self.beginResetModel()
+        self._rows_by_email = {account.email: AccountRow(account, self.warning_seconds) for account in self.accounts}
+        self._rebuild_visible()
+        self.endResetModel()
+
+    def account_changed(self, account):
+        row = AccountRow(account, self.warning_seconds)
+        self._rows_by_email[row.email] = row
+        position = self._position.get(row.email)
+        matches = self._matches(row)
+        if position is None:
+            if matches:
+                # New rows go at the end until the next sort
+                self.beginInsertRows(QModelIndex(), len(self._visible), len(self._visible))
+                self._position[row.email] = len(self._visible)
+                self._visible.append(row)
+                self.endInsertRows()
+        elif matches:
+            self._visible[position] = row
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(COLUMN_TITLES) - 1))
+        else:
+            self._remove_visible(position)
+
+    def account_removed(self, email):
+        self._rows_by_email.pop(email, None)
+        position = self._position.get(email)
+        if position is not None:
+            self._remove_visible(position)
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._rebuild_visible()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        emails = [self.email_at(index) for index in persistent]
+        self._sort_visible()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(self._position[email], index.column()) if email in self._position else QModelIndex()
+             for email, index in zip(emails, persistent)])
+        self.layoutChanged.emit()
+
+    def _matches(self, row):
+        return not self._filter or self._filter in row.search
+
+    def _rebuild_visible(self):
+        if self._filter:
+            self._visible = [row for row in self._rows_by_email.values() if self._filter in row.search]
+        else:
+            self._visible = list(self._rows_by_email.values())
+        self._sort_visible()
+
+    def _sort_visible(self):
+        if self._sort_column is not None:
+            self._visible.sort(key=SORT_KEYS[self._sort_column], reverse=self._sort_order == Qt.DescendingOrder)
+        self._position = {row.email: i for i, row in enumerate(self._visible)}
+
+    def _remove_visible(self, position):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._visible[position]
+        self.endRemoveRows()
+        self._position = {row.email: i for i, row in enumerate(self._visible)}
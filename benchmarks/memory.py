@@ -0,0 +1,140 @@
+import argparse
+import base64
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models import Account  # noqa: E402
+from parsing import apply_bans, parse_bans  # noqa: E402
+from store import AccountStore, account_row  # noqa: E402
+
+TITLES = ("Call of Duty: Modern Warfare", "Call of Duty: Warzone", "Call of Duty: Black Ops Cold War",
+          "Call of Duty: Vanguard", "Call of Duty: Modern Warfare II")
+
+
+class LegacyAccount:
+    # The Account layout before it was slotted: a per-instance __dict__, ISO text timestamps and raw ban dicts
+    def __init__(self, email, username, uno_id, sso_cookie, password="", platform="", last_status=""):
+        self.email = email
+        self.username = username
+        self.uno_id = uno_id
+        self.sso_cookie = sso_cookie
+        self.password = password
+        self.platform = platform
+        self.last_status = last_status
+        self.last_check_time = None
+        self.account_age = "Unknown"
+        self.psn_id = None
+        self.xbl_id = None
+        self.steam_id = None
+        self.battle_id = None
+        self.bans = []
+
+
+def ban_response(rng):
+    # Shaped like the appeal API: every response is decoded into fresh dicts and strings
+    roll = rng.random()
+    if roll < 0.7:
+        return json.loads('{"bans": [], "canAppeal": false}')
+    bans = []
+    for _ in range(rng.choice((1, 1, 1, 2))):
+        ban = {"enforcement": "UNDER_REVIEW" if roll < 0.85 else "PERMANENT",
+               "title": rng.choice(TITLES), "canAppeal": roll >= 0.85}
+        if roll >= 0.9:
+            ban["bar"] = {"Status": rng.choice(("Open", "Closed")), "CaseNumber": str(rng.randrange(10 ** 8))}
+        bans.append(ban)
+    return json.loads(json.dumps({"bans": bans, "canAppeal": roll >= 0.85}))
+
+
+def fields(i, rng):
+    expires = int(time.time()) + rng.randrange(14 * 24 * 3600)
+    cookie = base64.b64encode(f"{10 ** 18 + i}:{expires}:{rng.getrandbits(128):032x}".encode()).decode()
+    return (f"user{i}@example.com", f"user{i}", str(10 ** 18 + i), cookie, f"password{i}", "",
+            "Account not banned\nCookie expires in: 6 days, 3 hours, 12 minutes")
+
+
+def build_legacy(count, seed):
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        account = LegacyAccount(*fields(i, rng))
+        account.last_check_time = datetime.now().isoformat()
+        account.account_age = f"{rng.randrange(6)} years, {rng.randrange(12)} months, {rng.randrange(30)} days"
+        account.psn_id = f"psn_{i}" if rng.random() < 0.4 else None
+        account.battle_id = f"battle#{i}" if rng.random() < 0.6 else None
+        data = ban_response(rng)
+        account.can_appeal = data["canAppeal"]
+        account.bans = data["bans"]
+        accounts.append(account)
+    return accounts
+
+
+def build_compact(count, seed):
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        account = Account(*fields(i, rng))
+        account.add_status(account.last_status)
+        account.account_age = f"{rng.randrange(6)} years, {rng.randrange(12)} months, {rng.randrange(30)} days"
+        account.psn_id = f"psn_{i}" if rng.random() < 0.4 else None
+        account.battle_id = f"battle#{i}" if rng.random() < 0.6 else None
+        apply_bans(account, parse_bans(ban_response(rng)))
+        accounts.append(account)
+    return accounts
+
+
+def measure(build, count, seed):
+    gc.collect()
+    tracemalloc.start()
+    accounts = build(count, seed)
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return accounts, current / count
+
+
+def check_round_trip(accounts):
+    with tempfile.TemporaryDirectory() as directory:
+        store = AccountStore(os.path.join(directory, "accounts.db"))
+        started = time.perf_counter()
+        store.save_accounts(accounts)
+        saved = time.perf_counter() - started
+        started = time.perf_counter()
+        loaded = store.load_accounts()
+        load_time = time.perf_counter() - started
+        store.close()
+    mismatched = sum(1 for before, after in zip(accounts, loaded)
+                     if account_row(before) != account_row(after)
+                     or (before.ban_flags, before.appeal) != (after.ban_flags, after.appeal))
+    return saved, load_time, len(loaded) == len(accounts) and not mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the in-memory footprint of the old and new Account layout.")
+    parser.add_argument("--accounts", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    legacy, legacy_bytes = measure(build_legacy, args.accounts, args.seed)
+    del legacy
+    compact, compact_bytes = measure(build_compact, args.accounts, args.seed)
+    print(f"{args.accounts} accounts, about 30% banned")
+    print(f"  before (dict Account, raw ban dicts): {legacy_bytes:8.0f} bytes/account, "
+          f"{legacy_bytes * args.accounts / 2 ** 20:7.1f} MB total")
+    print(f"  after (slotted Account, BanEntry):    {compact_bytes:8.0f} bytes/account, "
+          f"{compact_bytes * args.accounts / 2 ** 20:7.1f} MB total ({1 - compact_bytes / legacy_bytes:.0%} less)")
+    saved, loaded, ok = check_round_trip(compact)
+    print(f"  store round trip: save {saved:.2f}s, load {loaded:.2f}s, {'identical' if ok else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+import argparse
+import base64
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from captcha import AdaptivePollSchedule, CaptchaSolver, EzCaptchaProvider  # noqa: E402
+from metrics import METRICS  # noqa: E402
+from models import Account  # noqa: E402
+from profiles import ProfileCache  # noqa: E402
+from registry import AccountRegistry  # noqa: E402
+from sessions import SessionPool  # noqa: E402
+from settings import Config  # noqa: E402
+from validation import CookieValidator  # noqa: E402
+
+BAN_PAYLOADS = {
+    "clean": [],
+    "shadow": [{"enforcement": "UNDER_REVIEW", "title": "Modern Warfare", "canAppeal": False}],
+    "permanent": [{"enforcement": "PERMANENT", "title": "Modern Warfare", "canAppeal": True}],
+    "appeal_open": [{"enforcement": "PERMANENT", "title": "Warzone", "canAppeal": True, "bar": {"Status": "Open"}}],
+    "appeal_denied": [{"enforcement": "PERMANENT", "title": "Warzone", "canAppeal": False,
+                       "bar": {"Status": "Closed"}}],
+}
+PROFILE = {
+    "username": "benchmark",
+    "created": "2019-10-25T12:00:00Z",
+    "accounts": [{"provider": "uno", "username": "benchmark#1234567"},
+                 {"provider": "battle", "username": "benchmark#1234"},
+                 {"provider": "psn", "username": "benchmark_psn"}],
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in BAN_PAYLOADS:
+            raise argparse.ArgumentTypeError(f"unknown ban payload {name!r}, expected one of {', '.join(BAN_PAYLOADS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Latency:
+    def __init__(self, median, sigma):
+        # Log-normal, which is how API latencies tend to look: most fast, a long slow tail
+        self.mu = math.log(max(median, 1e-6))
+        self.sigma = sigma
+
+    def sample(self, rng):
+        return rng.lognormvariate(self.mu, self.sigma) if self.sigma else math.exp(self.mu)
+
+
+class MockScenario:
+    def __init__(self, latency, captcha_latency, solve_time, jitter, error_rate, invalid_rate, ban_mix, seed):
+        self.api = Latency(latency, jitter)
+        self.captcha_api = Latency(captcha_latency, jitter)
+        self.solve = Latency(solve_time, jitter)
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.ban_names = list(ban_mix)
+        self.ban_weights = [ban_mix[name] for name in self.ban_names]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count(1)
+        self._ready_at = {}
+        self.served = {}
+
+    def draw(self, draw):
+        with self._lock:
+            return draw(self._rng)
+
+    def count(self, route):
+        with self._lock:
+            self.served[route] = self.served.get(route, 0) + 1
+
+    def new_task(self):
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._ready_at[task_id] = time.monotonic() + self.solve.sample(self._rng)
+        return task_id
+
+    def task_ready(self, task_id):
+        with self._lock:
+            ready_at = self._ready_at.get(task_id)
+            if ready_at is None or ready_at > time.monotonic():
+                return False
+            del self._ready_at[task_id]
+            return True
+
+    def ban_payload(self):
+        return BAN_PAYLOADS[self.draw(lambda rng: rng.choices(self.ban_names, self.ban_weights)[0])]
+
+
+def make_handler(scenario):
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, payload=None):
+            body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def delay(self, latency):
+            time.sleep(scenario.draw(latency.sample))
+            return scenario.draw(lambda rng: rng.random()) < scenario.error_rate
+
+        def read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_POST(self):
+            route = urlsplit(self.path).path
+            scenario.count(route)
+            payload = self.read_json()
+            if self.delay(scenario.captcha_api):
+                self.reply(502, {"errorId": 1, "errorDescription": "mock upstream error"})
+            elif route == "/createTask":
+                self.reply(200, {"errorId": 0, "taskId": scenario.new_task()})
+            elif route == "/getTaskResult":
+                if scenario.task_ready(payload.get("taskId")):
+                    self.reply(200, {"errorId": 0, "status": "ready",
+                                     "solution": {"gRecaptchaResponse": f"token-{payload.get('taskId')}"}})
+                else:
+                    self.reply(200, {"errorId": 0, "status": "processing"})
+            elif route == "/getBalance":
+                self.reply(200, {"errorId": 0, "balance": 42.0})
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_GET(self):
+            route = urlsplit(self.path).path
+            scenario.count(route)
+            if self.delay(scenario.api):
+                self.reply(500, {"error": "mock upstream error"})
+            elif route == "/api/bans/v2/appeal":
+                bans = scenario.ban_payload()
+                self.reply(200, {"bans": bans, "canAppeal": any(ban.get("canAppeal") for ban in bans)})
+            elif route == "/api/profile":
+                if scenario.draw(lambda rng: rng.random()) < scenario.invalid_rate:
+                    self.reply(401)
+                else:
+                    self.reply(200, PROFILE)
+            else:
+                self.reply(404, {"error": "not found"})
+
+    return MockHandler
+
+
+class MockServer:
+    def __init__(self, scenario):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(scenario))
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def configure(self, config):
+        config.account_check_url = f"{self.base_url}/api/bans/v2/appeal?locale=en"
+        config.profile_url = f"{self.base_url}/api/profile"
+        config.ez_captcha_api_url = f"{self.base_url}/createTask"
+        config.ez_captcha_result_url = f"{self.base_url}/getTaskResult"
+        config.ez_captcha_balance_url = f"{self.base_url}/getBalance"
+
+
+def make_accounts(count):
+    expires = int(time.time()) + 14 * 24 * 3600
+    return AccountRegistry(
+        Account(f"user{i}@example.com", f"user{i}", str(i),
+                base64.b64encode(f"{i}:{expires}:{i:032x}".encode()).decode())
+        for i in range(count))
+
+
+def quiet(message):
+    pass
+
+
+def run_checks(accounts, config, http, solver):
+    # Drives the same thread class the GUI uses, synchronously; falls back to the engine when Qt is missing
+    profiles = ProfileCache(http, ttl=config.profile_cache_ttl, url=config.profile_url)
+    try:
+        from main import CheckAccountsThread
+    except ImportError:
+        from checker import AccountChecker
+        from engine import CheckEngine
+
+        checker = AccountChecker(accounts, config, http, profiles, solver, log=quiet)
+        engine = CheckEngine(checker, config, log=quiet)
+        engine.run(list(accounts))
+        return engine.completed
+    thread = CheckAccountsThread(accounts, config, accounts.emails(), http=http, profiles=profiles, solver=solver)
+    thread.run()
+    return thread.engine.completed
+
+
+def run_validation(accounts, config, http, solver):
+    profiles = ProfileCache(http, ttl=config.profile_cache_ttl, url=config.profile_url)
+    validator = CookieValidator(profiles, config.validation_concurrency, quiet)
+    return len(validator.run(list(accounts)))
+
+
+def solve_status_captcha(solver, config):
+    try:
+        return solver.solve(config.page_url, config.status_site_key)
+    except Exception:
+        return None
+
+
+def solve_many(solver, config, count, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tokens = list(executor.map(lambda _: solve_status_captcha(solver, config), range(count)))
+    return sum(1 for token in tokens if token)
+
+
+def run_captcha(accounts, config, http, solver):
+    return solve_many(solver, config, len(accounts), config.check_concurrency)
+
+
+SCENARIOS = {"check": run_checks, "validate": run_validation, "captcha": run_captcha}
+
+
+def measure(name, accounts, config, http, solver):
+    before = METRICS.snapshot()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    completed = SCENARIOS[name](accounts, config, http, solver)
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "accounts": len(accounts),
+        "completed": completed,
+        "elapsed": round(elapsed, 3),
+        "per_minute": round(completed / elapsed * 60, 1) if elapsed else 0.0,
+        "peak_memory_mb": round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2),
+        "phases": METRICS.phase_quantiles(before),
+    }
+
+
+def print_result(result):
+    print(f"{result['scenario']}: {result['completed']}/{result['accounts']} in {result['elapsed']:.1f}s, "
+          f"{result['per_minute']:.1f} accounts/min, peak memory {result['peak_memory_mb']:.1f} MB")
+    for phase, stats in sorted(result["phases"].items()):
+        print(f"  {phase:<15} n={stats['count']:<6} p50 {stats['p50'] * 1000:8.1f} ms   "
+              f"p95 {stats['p95'] * 1000:8.1f} ms   p99 {stats['p99'] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure check, validation and captcha throughput against a local mock of the remote APIs.")
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--scenarios", default="check,validate,captcha",
+                        help=f"comma separated, from {', '.join(SCENARIOS)} (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, help="check_concurrency (default: the Config default)")
+    parser.add_argument("--rate", type=float, help="request_rate per second, 0 for none (default: the Config default)")
+    parser.add_argument("--latency", type=float, default=0.15, help="median ban/profile API latency in seconds")
+    parser.add_argument("--captcha-latency", type=float, default=0.05, help="median captcha API latency in seconds")
+    parser.add_argument("--solve-time", type=float, default=1.0, help="median captcha solve time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="log-normal sigma for all latencies, 0 for fixed")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests answered with a 5xx")
+    parser.add_argument("--invalid-rate", type=float, default=0.05, help="share of profile requests answered 401")
+    parser.add_argument("--ban-mix", type=parse_mix, default="clean=70,shadow=15,permanent=10,appeal_open=3,appeal_denied=2")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per scenario instead")
+    args = parser.parse_args()
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    scenario = MockScenario(args.latency, args.captcha_latency, args.solve_time, args.jitter, args.error_rate,
+                            args.invalid_rate, args.ban_mix, args.seed)
+    config = Config(ez_captcha_key="benchmark")
+    if args.concurrency is not None:
+        config.check_concurrency = args.concurrency
+    if args.rate is not None:
+        config.request_rate = args.rate
+    accounts = make_accounts(args.accounts)
+    tracemalloc.start()
+    with MockServer(scenario) as server:
+        server.configure(config)
+        http = SessionPool(config)
+        solver = CaptchaSolver(EzCaptchaProvider(http, config))
+        # Teach the poll schedule the mock's solve times first, as a long-running session would have
+        solve_many(solver, config, AdaptivePollSchedule.MIN_SAMPLES * 2, AdaptivePollSchedule.MIN_SAMPLES * 2)
+        if not args.json:
+            print(f"Mock server at {server.base_url}: {args.accounts} accounts, concurrency {config.check_concurrency}, "
+                  f"request rate {config.request_rate or 'unlimited'}/s")
+        for name in names:
+            result = measure(name, accounts, config, http, solver)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print_result(result)
+        http.close()
+    if not args.json:
+        print(f"Requests served: {json.dumps(scenario.served)}")
+
+
+if __name__ == "__main__":
+    main()
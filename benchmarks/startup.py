@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter for every sample, so imports are always cold for this process
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+marks = {}
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and "first_paint" not in marks:
+            marks["first_paint"] = time.perf_counter()
+        return False
+
+load_data = main.MainWindow.load_data
+def timed_load_data(self):
+    load_data(self)
+    marks["accounts_loaded"] = time.perf_counter()
+    QTimer.singleShot(0, app.quit)
+main.MainWindow.load_data = timed_load_data
+
+app = QApplication(sys.argv[:1])
+watcher = FirstPaint()
+app.installEventFilter(watcher)
+window = main.MainWindow()
+constructed = time.perf_counter()
+window.show()
+app.exec_()
+heavy = [name for name in ("undetected_chromedriver", "selenium") if name in sys.modules]
+print(json.dumps({
+    "import": imported - started,
+    "window": constructed - imported,
+    "first_paint": marks.get("first_paint", constructed) - started,
+    "accounts_loaded": marks["accounts_loaded"] - started,
+    "accounts": len(main.accounts),
+    "heavy_modules": heavy,
+}))
+"""
+
+
+def make_fixture(directory, count):
+    sys.path.insert(0, ROOT)
+    from models import Account
+    from settings import Config
+    from store import AccountStore
+
+    store = AccountStore(os.path.join(directory, "accounts.db"))
+    store.set_meta("json_migrated", "1")
+    config = Config(ez_captcha_key="benchmark")
+    store.save_config(config)
+    store.save_accounts([Account(f"user{i}@example.com", f"user{i}", str(i), "", "", "", "Account not banned")
+                         for i in range(count)])
+    store.close()
+
+
+def run_once(directory, platform):
+    env = dict(os.environ, QT_QPA_PLATFORM=platform, PYTHONDONTWRITEBYTECODE="")
+    output = subprocess.run([sys.executable, "-c", CHILD, ROOT], cwd=directory, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GUI startup: import time and time to first paint.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--accounts", type=int, default=5000, help="accounts in the generated database")
+    parser.add_argument("--platform", default="offscreen", help="Qt platform plugin (default: %(default)s)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        make_fixture(directory, args.accounts)
+        run_once(directory, args.platform)  # warm the OS file cache and .pyc files
+        samples = [run_once(directory, args.platform) for _ in range(args.runs)]
+    print(f"{args.runs} runs, {samples[0]['accounts']} accounts, platform {args.platform}")
+    for key in ("import", "window", "first_paint", "accounts_loaded"):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f"  {key:<16} median {statistics.median(values):7.1f} ms   min {min(values):7.1f} ms")
+    print(f"  heavy modules loaded at startup: {', '.join(samples[0]['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import queue
+import statistics
+import threading
+import time
+
+# Origins whose cookies and storage are wiped between accounts
+WIPE_ORIGINS = ("https://support.activision.com", "https://s.activision.com", "https://www.activision.com")
+WIPE_STORAGE_TYPES = "cookies,local_storage,session_storage,indexeddb,websql,service_workers,cache_storage"
+
+
+def wipe_browser(driver):
+    for handle in driver.window_handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(driver.window_handles[0])
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    for origin in WIPE_ORIGINS:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storage_types": WIPE_STORAGE_TYPES})
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+_RETRY = object()
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class BrowserPool:
+    def __init__(self, launch, size, max_uses, prepare=None, log=print):
+        # launch() -> new driver; prepare(driver) runs on a clean browser before it is handed out
+        self.launch = launch
+        self.prepare = prepare
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.log = log
+        self._lock = threading.Lock()
+        self._ready = queue.Queue()
+        self._live = 0
+        self._closed = False
+        self._threads = []
+        self.launch_times = []
+        self.prepare_times = []
+        self.acquire_waits = []
+        self.launched = 0
+        self.reused = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    def warm(self):
+        for _ in range(self.size):
+            self._spawn(self._launch_into_pool)
+
+    def acquire(self):
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                can_launch = self._live < self.size and self._ready.empty()
+                if can_launch:
+                    self._live += 1
+            if can_launch:
+                browser = self._launch()
+                self.acquire_waits.append(time.monotonic() - started)
+                return browser
+            browser = self._ready.get()
+            if browser is _RETRY:
+                continue
+            if browser is None:
+                raise RuntimeError("Browser pool is closed")
+            self.reused += browser.uses > 0
+            self.acquire_waits.append(time.monotonic() - started)
+            return browser
+
+    def release(self, browser, healthy=True):
+        browser.uses += 1
+        if self._closed or not healthy or browser.uses >= self.max_uses:
+            if healthy and browser.uses >= self.max_uses:
+                self.recycled += 1
+            elif not healthy:
+                self.crashed += 1
+            self._discard(browser)
+            if not self._closed:
+                self._spawn(self._launch_into_pool)
+            return
+        self._spawn(self._recycle_into_pool, browser)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        for thread in self._threads:
+            thread.join()
+        while not self._ready.empty():
+            browser = self._ready.get_nowait()
+            if isinstance(browser, PooledBrowser):
+                self._discard(browser)
+        self._ready.put(None)
+
+    def summary(self):
+        parts = [f"Browser pool: {self.launched} launched, {self.reused} reused, "
+                 f"{self.recycled} recycled, {self.crashed} crashed"]
+        if self.launch_times:
+            parts.append(f"median launch {statistics.median(self.launch_times):.1f}s")
+        if self.prepare_times:
+            parts.append(f"median wipe+prepare {statistics.median(self.prepare_times):.1f}s")
+        if self.acquire_waits:
+            parts.append(f"median wait for a browser {statistics.median(self.acquire_waits):.1f}s")
+        return ", ".join(parts)
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+
+    def _launch(self):
+        started = time.monotonic()
+        try:
+            driver = self.launch()
+            if self.prepare is not None:
+                self.prepare(driver)
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        self.launched += 1
+        self.launch_times.append(time.monotonic() - started)
+        return PooledBrowser(driver)
+
+    def _launch_into_pool(self):
+        with self._lock:
+            if self._closed or self._live >= self.size:
+                return
+            self._live += 1
+        try:
+            browser = self._launch()
+        except Exception as e:
+            self.log(f"Failed to launch browser: {str(e)}")
+            # Wake up a waiting acquire() so it can try launching itself
+            self._ready.put(_RETRY)
+            return
+        self._ready.put(browser)
+
+    def _recycle_into_pool(self, browser):
+        started = time.monotonic()
+        try:
+            wipe_browser(browser.driver)
+            if self.prepare is not None:
+                self.prepare(browser.driver)
+        except Exception as e:
+            self.crashed += 1
+            self.log(f"Browser failed to reset, replacing it: {str(e)}")
+            self._discard(browser)
+            self._launch_into_pool()
+            return
+        self.prepare_times.append(time.monotonic() - started)
+        self._ready.put(browser)
+
+    def _discard(self, browser):
+        with self._lock:
+            self._live -= 1
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,298 @@
+import statistics
+import threading
+import time
+from collections import deque
+
+from metrics import METRICS, PHASE_CAPTCHA_CREATE, PHASE_CAPTCHA_POLL, PHASE_CAPTCHA_SOLVE
+from settings import (
+    CAPTCHA_TIMEOUT, CAPTCHA_TOKEN_TTL, CAPTCHA_INITIAL_POLL_DELAY, CAPTCHA_MIN_POLL_INTERVAL,
+    CAPTCHA_MAX_POLL_INTERVAL, EZ_CAPTCHA_APP_ID
+)
+
+
+class CaptchaError(Exception):
+    pass
+
+
+class CaptchaProvider:
+    name = ""
+
+    def create_task(self, website_url, website_key):
+        raise NotImplementedError
+
+    def get_result(self, task_id):
+        # Returns the token once solved, None while the task is still processing
+        raise NotImplementedError
+
+    def get_balance(self):
+        raise NotImplementedError
+
+
+class EzCaptchaProvider(CaptchaProvider):
+    name = "ez-captcha"
+
+    def __init__(self, http, config):
+        self.http = http
+        self.config = config
+
+    def _post(self, url, payload):
+        response = self.http.post(url, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def create_task(self, website_url, website_key):
+        result = self._post(self.config.ez_captcha_api_url, {
+            "clientKey": self.config.ez_captcha_key,
+            "appId": EZ_CAPTCHA_APP_ID,
+            "task": {
+                "type": "ReCaptchaV2TaskProxyless",
+                "websiteURL": website_url,
+                "websiteKey": website_key,
+                "isInvisible": False,
+            },
+        })
+        if result.get("errorId") != 0:
+            raise CaptchaError(f"Error creating captcha task: {result.get('errorDescription')}")
+        return result["taskId"]
+
+    def get_result(self, task_id):
+        result = self._post(self.config.ez_captcha_result_url, {
+            "clientKey": self.config.ez_captcha_key,
+            "taskId": task_id,
+        })
+        if result.get("status") == "ready":
+            return result.get("solution", {}).get("gRecaptchaResponse")
+        if result.get("status") == "processing":
+            return None
+        raise CaptchaError(f"Unexpected captcha status: {result.get('status')}")
+
+    def get_balance(self):
+        data = self._post(self.config.ez_captcha_balance_url, {"clientKey": self.config.ez_captcha_key})
+        if data.get("errorId", 0) != 0:
+            raise CaptchaError(f"API error: {data.get('errorDescription', 'Unknown error')}")
+        return data.get("balance", 0)
+
+
+class AdaptivePollSchedule:
+    MIN_SAMPLES = 5
+    MIN_FIRST_DELAY = 0.25
+
+    def __init__(self, initial_delay=CAPTCHA_INITIAL_POLL_DELAY, min_interval=CAPTCHA_MIN_POLL_INTERVAL,
+                 max_interval=CAPTCHA_MAX_POLL_INTERVAL, backoff=1.5, window=200):
+        self.initial_delay = initial_delay
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+
+    def observe(self, solve_seconds, last_miss=0.0):
+        # A poll only shows the task finished somewhere after the previous empty poll (last_miss), so the
+        # midpoint is kept; taking the poll time itself would only ever confirm the current schedule
+        with self._lock:
+            self._samples.append((last_miss + solve_seconds) / 2)
+
+    def quantiles(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in (0.25, 0.5, 0.75, 0.9)}
+
+    def delays(self):
+        # Poll at the learned p25/p50/p75/p90 solve times, then back off until the timeout. The first poll never
+        # comes later than initial_delay, so fast solves keep producing samples that pull the schedule down
+        quantiles = self.quantiles()
+        if quantiles is None:
+            first, targets = self.initial_delay, ()
+        else:
+            first = max(self.MIN_FIRST_DELAY, min(self.initial_delay, quantiles[0.25]))
+            targets = (quantiles[0.25], quantiles[0.5], quantiles[0.75], quantiles[0.9])
+        yield first
+        elapsed = first
+        for target in targets:
+            if target - elapsed >= self.min_interval:
+                yield target - elapsed
+                elapsed = target
+        interval = self.min_interval
+        while True:
+            yield interval
+            interval = min(self.max_interval, interval * self.backoff)
+
+
+class CaptchaStats:
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self.solved = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.solve_times = deque(maxlen=window)
+        self.polls = deque(maxlen=window)
+        self.use_delays = deque(maxlen=window)
+
+    def task_solved(self, seconds, polls):
+        METRICS.inc("captcha_solves")
+        METRICS.observe(PHASE_CAPTCHA_SOLVE, seconds)
+        with self._lock:
+            self.solved += 1
+            self.solve_times.append(seconds)
+            self.polls.append(polls)
+
+    def task_failed(self, timed_out=False):
+        METRICS.inc("captcha_timeouts" if timed_out else "captcha_errors")
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+    def token_used(self, age):
+        with self._lock:
+            self.use_delays.append(age)
+
+    def summary(self):
+        with self._lock:
+            parts = [f"Captcha: {self.solved} solved, {self.errors} errors, {self.timeouts} timeouts"]
+            if self.solve_times:
+                parts.append(f"median solve {statistics.median(self.solve_times):.1f}s")
+                parts.append(f"median polls {statistics.median(self.polls):g}")
+            if self.use_delays:
+                parts.append(f"median solve-to-use {statistics.median(self.use_delays):.1f}s")
+        return ", ".join(parts)
+
+
+class CaptchaSolver:
+    def __init__(self, provider, timeout=CAPTCHA_TIMEOUT):
+        self.provider = provider
+        self.timeout = timeout
+        self.stats = CaptchaStats()
+        self._lock = threading.Lock()
+        self._schedules = {}
+
+    def schedule_for(self, website_key):
+        with self._lock:
+            schedule = self._schedules.get(website_key)
+            if schedule is None:
+                schedule = self._schedules[website_key] = AdaptivePollSchedule()
+            return schedule
+
+    def solve(self, website_url, website_key, stop=None):
+        schedule = self.schedule_for(website_key)
+        try:
+            with METRICS.timer(PHASE_CAPTCHA_CREATE):
+                task_id = self.provider.create_task(website_url, website_key)
+        except Exception:
+            self.stats.task_failed()
+            raise
+        started = time.monotonic()
+        polls = 0
+        last_miss = 0.0
+        for delay in schedule.delays():
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            delay = min(delay, remaining)
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return None
+            polls += 1
+            try:
+                with METRICS.timer(PHASE_CAPTCHA_POLL):
+                    token = self.provider.get_result(task_id)
+            except Exception:
+                self.stats.task_failed()
+                raise
+            if token:
+                elapsed = time.monotonic() - started
+                schedule.observe(elapsed, last_miss)
+                self.stats.task_solved(elapsed, polls)
+                return token
+            last_miss = time.monotonic() - started
+        self.stats.task_failed(timed_out=True)
+        raise CaptchaError("Captcha solving timed out")
+
+    def get_balance(self):
+        return self.provider.get_balance()
+
+
+class CaptchaPipeline:
+    def __init__(self, solve, total, depth, token_ttl=CAPTCHA_TOKEN_TTL, stats=None):
+        # solve(stop_event) -> token or None; it should return early once stop_event is set
+        self._solve = solve
+        self.stats = stats
+        self.depth = max(1, depth)
+        self.token_ttl = token_ttl
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._pending = total
+        self._in_flight = 0
+        self._ready = deque()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(self.depth)]
+        self.solved = 0
+        self.failed = 0
+        self.expired = 0
+        self.handed_out = 0
+        self.wait_time = 0.0
+
+    def start(self):
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._stop.set()
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._stop.is_set() and not (
+                        self._pending > 0 and self._in_flight + len(self._ready) < self.depth):
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                self._pending -= 1
+                self._in_flight += 1
+            token = self._solve(self._stop)
+            with self._cond:
+                self._in_flight -= 1
+                if token:
+                    self.solved += 1
+                self._ready.append((token, time.monotonic()))
+                self._cond.notify_all()
+
+    def take(self):
+        started = time.monotonic()
+        with self._cond:
+            try:
+                while True:
+                    if not self._ready and not self._in_flight and self._pending <= 0:
+                        # Asked for more tokens than planned (e.g. after expiries); add demand
+                        self._pending += 1
+                        self._cond.notify_all()
+                    while not self._ready and not self._stop.is_set():
+                        self._cond.wait()
+                    if self._stop.is_set():
+                        return None
+                    token, solved_at = self._ready.popleft()
+                    self._cond.notify_all()
+                    if not token:
+                        self.failed += 1
+                        return None
+                    age = time.monotonic() - solved_at
+                    if age > self.token_ttl:
+                        self.expired += 1
+                        self._pending += 1
+                        continue
+                    self.handed_out += 1
+                    if self.stats is not None:
+                        self.stats.token_used(age)
+                    return token
+            finally:
+                self.wait_time += time.monotonic() - started
+
+    def summary(self):
+        return (f"Captcha pipeline (depth {self.depth}): {self.solved} solved, {self.handed_out} used, "
+                f"{self.expired} expired, {self.failed} failed, {self.wait_time:.1f}s spent waiting for tokens")
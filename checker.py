@@ -0,0 +1,144 @@
+import base64
+import threading
+import time
+from datetime import datetime, timezone
+
+import iso8601
+import requests
+
+from captcha import CaptchaError
+from metrics import METRICS, PHASE_BAN_API, PHASE_CHECK
+from models import is_failed_status
+from parsing import apply_bans, apply_profile, parse_bans, parse_profile
+from profiles import ProfileError
+from settings import USER_AGENT
+
+
+class AccountChecker:
+    def __init__(self, accounts, config, http, profiles, solver, history=None, log=print):
+        self.accounts = accounts
+        self.config = config
+        self.http = http
+        self.profiles = profiles
+        self.solver = solver
+        self.history = history
+        self.log = log
+        self.captcha_pipeline = None
+        self.cancelled = threading.Event()
+
+    def process(self, account):
+        started = time.perf_counter()
+        ban_status = self.check_account(account)
+        if self.cancelled.is_set() and is_failed_status(ban_status):
+            # The captcha wait was cut short by the cancel, not by a real failure
+            return None
+        METRICS.inc("checks", result="failed" if is_failed_status(ban_status) else "ok")
+        account.add_status(ban_status)
+        self.log(f"{account.email}: {ban_status}")
+        age_status = self.check_account_age(account)
+        account.account_age = age_status
+        self.log(f"{account.email} Age: {age_status}")
+        self.record_history(account, ban_status)
+        METRICS.observe(PHASE_CHECK, time.perf_counter() - started)
+        return ban_status, age_status
+
+    def next_status_captcha(self):
+        if self.captcha_pipeline is not None:
+            return self.captcha_pipeline.take()
+        return self.solve_status_check_captcha(self.cancelled)
+
+    def check_account(self, account):
+        captcha_response = self.next_status_captcha()
+        if not captcha_response:
+            return "Failed to solve status check captcha"
+        headers = {
+            "Cookie": f"ACT_SSO_COOKIE={account.sso_cookie}",
+            "User-Agent": USER_AGENT,
+        }
+        params = {"g-cc": captcha_response}
+        try:
+            with METRICS.timer(PHASE_BAN_API):
+                response = self.http.get(self.config.account_check_url, headers=headers, params=params)
+                response.raise_for_status()
+                data = response.json()
+            if data.get("error"):
+                return f"API error: {data['error']}"
+            bans = parse_bans(data)
+            apply_bans(account, bans)
+            if not bans.bans:
+                return bans.status()
+            status = bans.status()
+            try:
+                profile_data = self.profiles.get(account.email, account.sso_cookie)
+            except (ProfileError, requests.RequestException, ValueError):
+                profile_data = None
+            if profile_data:
+                apply_profile(account, parse_profile(profile_data))
+                self.accounts.reindex(account)
+            cookie_status = self.decode_sso_cookie(account.sso_cookie)
+            if "Error decoding cookie" in cookie_status:
+                account.cookie_error = cookie_status
+            else:
+                status += f"\n{cookie_status}"
+            return status
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def record_history(self, account, ban_status):
+        if self.history is None or is_failed_status(ban_status):
+            return
+        try:
+            if self.history.record(account):
+                self.log(f"{account.email}: status changed since last check")
+        except Exception as e:
+            self.log(f"Error recording status history for {account.email}: {str(e)}")
+
+    def check_account_age(self, account):
+        try:
+            profile_data = self.profiles.get(account.email, account.sso_cookie)
+            created_date = profile_data.get("created")
+            if created_date:
+                created = iso8601.parse_date(created_date)
+                now = datetime.now(timezone.utc)
+                age = now - created
+                years = age.days // 365
+                months = (age.days % 365) // 30
+                days = (age.days % 365) % 30
+                return f"{years} years, {months} months, {days} days"
+            else:
+                return "Unknown"
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def decode_sso_cookie(self, sso_cookie):
+        try:
+            decoded_cookie = base64.b64decode(sso_cookie).decode('utf-8')
+            parts = decoded_cookie.split(':')
+            if len(parts) != 3:
+                return "Unexpected cookie format"
+
+            account_id, expiration_timestamp, hash_value = parts
+            expiration_date = datetime.fromtimestamp(int(expiration_timestamp), tz=timezone.utc)
+            now = datetime.now(timezone.utc)
+            time_left = expiration_date - now
+
+            if time_left.total_seconds() > 0:
+                days_left = time_left.days
+                hours_left = time_left.seconds // 3600
+                minutes_left = (time_left.seconds % 3600) // 60
+                return f"Cookie expires in: {days_left} days, {hours_left} hours, {minutes_left} minutes"
+            else:
+                return "Cookie has expired"
+        except Exception as e:
+            return f"Error decoding cookie: {str(e)}"
+
+    def solve_status_check_captcha(self, stop=None):
+        try:
+            return self.solver.solve(self.config.page_url, self.config.status_site_key, stop)
+        except CaptchaError as e:
+            self.log(str(e))
+        except requests.RequestException as e:
+            self.log(f"HTTP error occurred: {e}")
+        except Exception as e:
+            self.log(f"Error solving status captcha: {str(e)}")
+        return None
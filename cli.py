@@ -0,0 +1,468 @@
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+import requests
+
+from captcha import CaptchaError, CaptchaSolver, EzCaptchaProvider
+from checker import AccountChecker
+from cookies import COOKIE_EXPIRING_SOON, COOKIE_STATES, CookieTriage
+from engine import CheckEngine
+from exporter import (
+    EXPORT_FORMATS, AccountExporter, ExportError, ExportFilter, check_output_path, resolve_export_format
+)
+from history import StatusHistory, status_text
+from importer import IMPORT_FORMATS, CredentialImporter, ImportFormatError, detect_format
+from journal import RunJournal
+from metrics import METRICS, MetricsExporter
+from models import is_failed_status
+from monitor import StatusMonitor, build_notifier
+from persister import AccountPersister
+from profiles import ProfileCache
+from scheduler import REASON_NO_COOKIE, CheckScheduler
+from registry import AccountRegistry, CredentialRegistry
+from sessions import SessionPool
+from settings import ACCOUNTS_DB_FILE_NAME, Config
+from store import AccountStore
+from validation import CookieValidator
+
+EXIT_OK = 0
+EXIT_FAILURES = 1  # the run finished but some accounts failed, were invalid or could not log in
+EXIT_USAGE = 2  # bad arguments or unknown account emails
+EXIT_SETUP = 3  # database, config or API key problem
+EXIT_CANCELLED = 130
+
+
+class UnknownAccountsError(Exception):
+    # Raised for emails given on the command line that are not in the database
+    def __init__(self, emails):
+        super().__init__(", ".join(emails))
+        self.emails = emails
+
+
+class WorkerError(Exception):
+    # Raised in the main thread for an exception that ended the work started by run_cancellable
+    pass
+
+
+class JsonLinesReporter:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        line = json.dumps({"event": event, "time": round(time.time(), 3), **fields})
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def progress(self, completed, total):
+        self.emit("progress", completed=completed, total=total)
+
+
+class ReporterSink:
+    def __init__(self, reporter):
+        self.reporter = reporter
+
+    def send(self, transitions):
+        for transition in transitions:
+            self.reporter.emit("transition", **transition.to_dict())
+
+
+class BatchRunner:
+    def __init__(self, db_path, reporter, load_accounts=True):
+        self.reporter = reporter
+        self.config = Config()
+        self.store = AccountStore(db_path)
+        summary = self.store.migrate_from_json(self.config)
+        if summary:
+            self.reporter.emit("migrated", **summary)
+        self.store.load_config(self.config)
+        self.metrics = MetricsExporter(METRICS, self.config.metrics_file, self.config.metrics_interval,
+                                       self.config.metrics_port, self.reporter.log)
+        self.journal = RunJournal(self.store)
+        self.persister = AccountPersister(self.store, journal=self.journal, log=self.reporter.log)
+        self.http = SessionPool(self.config)
+        self.solver = CaptchaSolver(EzCaptchaProvider(self.http, self.config))
+        self.history = StatusHistory(self.store, self.persister)
+        self.history.prune(self.config.history_retention_days, self.config.history_compact_after_days)
+        self.profiles = ProfileCache(self.http, self.store, self.config.profile_cache_ttl, self.config.profile_url)
+        self.profiles.prune()
+        self.accounts = AccountRegistry()
+        # Exports stream straight from the database and never need the accounts in memory
+        if load_accounts:
+            for account in self.store.load_accounts():
+                self.accounts.add(account)
+
+    def close(self):
+        self.metrics.close()
+        self.persister.close()
+        self.http.close()
+        self.store.close()
+
+    def select(self, emails):
+        if not emails:
+            return list(self.accounts)
+        unknown = [email for email in emails if email not in self.accounts]
+        if unknown:
+            raise UnknownAccountsError(unknown)
+        return [self.accounts.get(email) for email in emails]
+
+    def run_cancellable(self, target, cancel):
+        # Work runs off the main thread so Ctrl+C can cancel it cleanly instead of killing it mid-write
+        result = {}
+
+        def work():
+            try:
+                result["value"] = target()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        cancelled = False
+        while thread.is_alive():
+            try:
+                thread.join(0.2)
+            except KeyboardInterrupt:
+                if not cancelled:
+                    self.reporter.log("Cancelling...")
+                    cancel()
+                    cancelled = True
+        if "error" in result:
+            error = result["error"]
+            raise WorkerError(f"{type(error).__name__}: {str(error)}") from error
+        return result.get("value"), cancelled
+
+    def start_run(self, kind, emails, fresh):
+        previous = None if fresh else self.journal.unfinished(kind)
+        run = self.journal.start(kind, emails, previous["run_id"] if previous and previous["done"] else None)
+        self.reporter.emit("run", run_id=run.run_id, resumed=run.resumed, total=run.total, already_done=len(run.done))
+        self.reporter.log(run.summary())
+        return run
+
+    def finish_run(self, run, completed, cancelled):
+        self.persister.flush()
+        self.journal.finish(run, cancelled)
+        self.reporter.log(run.final_summary(completed, cancelled))
+
+    def check(self, emails, fresh=False, check_all=False):
+        if not self.config.ez_captcha_key:
+            self.reporter.emit("error", message="EZ-Captcha API key is not set")
+            return EXIT_SETUP
+        selected = self.select(emails)
+        if not emails and not check_all and self.config.scheduled_checks:
+            plan = CheckScheduler(self.config).plan(selected)
+            self.reporter.emit("schedule", due=len(plan.due), fresh=len(plan.fresh), unusable=len(plan.unusable),
+                               reasons=plan.reasons)
+            self.reporter.log(plan.summary())
+            for account in plan.unusable:
+                self.reporter.emit("warning", email=account.email, reason=REASON_NO_COOKIE)
+            if not plan.due:
+                # No run is started or journalled when there is nothing a check could do
+                self.reporter.emit("summary", command="check", total=0, checked=0, unusable=len(plan.unusable))
+                return EXIT_OK
+            selected = plan.due
+        run = self.start_run("check", [account.email for account in selected], fresh)
+        to_check = run.pending(selected)
+        failed = []
+
+        def on_result(account, ban_status, age_status):
+            self.persister.mark_dirty(account, run.checkpoint(account.email))
+            if is_failed_status(ban_status):
+                failed.append(account.email)
+            self.reporter.emit("result", email=account.email, status=ban_status, age=age_status)
+
+        checker = AccountChecker(self.accounts, self.config, self.http, self.profiles, self.solver,
+                                 self.history, self.reporter.log)
+        engine = CheckEngine(checker, self.config, on_result, self.reporter.progress, self.reporter.log)
+        _, cancelled = self.run_cancellable(lambda: engine.run(to_check), engine.cancel)
+        self.finish_run(run, engine.completed, cancelled)
+        self.reporter.emit("summary", command="check", run_id=run.run_id, total=len(selected),
+                           already_done=len(run.done), checked=engine.completed,
+                           skipped=len(to_check) - engine.total, failed=len(failed), elapsed=round(engine.elapsed, 3),
+                           phases=METRICS.phase_quantiles(engine.metrics_start))
+        if cancelled:
+            return EXIT_CANCELLED
+        return EXIT_FAILURES if failed or engine.completed < engine.total else EXIT_OK
+
+    def monitor(self, notify_file=None, webhook_url=None, cycles=None):
+        if not self.config.ez_captcha_key:
+            self.reporter.emit("error", message="EZ-Captcha API key is not set")
+            return EXIT_SETUP
+        if notify_file is not None:
+            self.config.monitor_notify_file = notify_file
+        if webhook_url is not None:
+            self.config.monitor_webhook_url = webhook_url
+
+        def on_result(account, ban_status, age_status):
+            self.reporter.emit("result", email=account.email, status=ban_status, age=age_status)
+
+        notifier = build_notifier(self.config, self.http, self.reporter.log, [ReporterSink(self.reporter)])
+        checker = AccountChecker(self.accounts, self.config, self.http, self.profiles, self.solver,
+                                 self.history, self.reporter.log)
+        monitor = StatusMonitor(self.accounts, checker, self.config, notifier, self.persister, on_result,
+                                cycles, self.reporter.log)
+        try:
+            _, cancelled = self.run_cancellable(monitor.run, monitor.stop)
+        finally:
+            notifier.close()
+            self.persister.flush()
+        self.reporter.emit("summary", command="monitor", cycles=monitor.cycles, checked=monitor.checked,
+                           transitions=monitor.transitions, notifications_sent=notifier.sent)
+        return EXIT_CANCELLED if cancelled else EXIT_OK
+
+    def validate(self, emails):
+        triage = CookieTriage(self.select(emails), self.config.cookie_expiry_warning)
+        self.reporter.log(triage.summary())
+        results = {}
+        for state, account in triage.doomed():
+            results[account.email] = False
+            self.reporter.emit("result", email=account.email, valid=False, reason=state)
+        for account in triage.groups[COOKIE_EXPIRING_SOON]:
+            self.reporter.emit("warning", email=account.email, reason=COOKIE_EXPIRING_SOON)
+        to_validate = triage.checkable()
+        validator = CookieValidator(self.profiles, self.config.validation_concurrency, self.reporter.log)
+        completed = [0]
+
+        def on_result(account, is_valid):
+            completed[0] += 1
+            self.reporter.emit("result", email=account.email, valid=is_valid)
+            self.reporter.progress(completed[0], len(to_validate))
+
+        validated, cancelled = self.run_cancellable(lambda: validator.run(to_validate, on_result), validator.cancel)
+        results.update(validated or {})
+        invalid = [email for email, is_valid in results.items() if not is_valid]
+        for email in invalid:
+            self.accounts.update(self.accounts.get(email), sso_cookie="")
+        self.persister.flush()
+        self.store.save_accounts(self.accounts)
+        self.reporter.emit("summary", command="validate", total=len(results),
+                           valid=len(results) - len(invalid), invalid=len(invalid))
+        if cancelled:
+            return EXIT_CANCELLED
+        return EXIT_FAILURES if invalid else EXIT_OK
+
+    def login(self, emails, fresh=False):
+        # Chrome and selenium are only needed here, so other commands never import them
+        from login import AccountLogin
+
+        if not self.config.ez_captcha_key:
+            self.reporter.emit("error", message="EZ-Captcha API key is not set")
+            return EXIT_SETUP
+        credentials = self.store.load_login_credentials()
+        if emails:
+            known = {cred.email for cred in credentials}
+            unknown = [email for email in emails if email not in known]
+            if unknown:
+                raise UnknownAccountsError(unknown)
+            credentials = [cred for cred in credentials if cred.email in emails]
+
+        def on_result(cred, success):
+            self.reporter.emit("result", email=cred.email, logged_in=success)
+
+        run = self.start_run("login", [cred.email for cred in credentials], fresh)
+        login = AccountLogin(credentials, self.accounts, self.config, self.http, self.profiles, self.solver,
+                             self.persister.mark_dirty, on_result,
+                             self.reporter.progress, self.reporter.log, run)
+        _, cancelled = self.run_cancellable(login.run, login.cancel)
+        self.finish_run(run, login.succeeded, cancelled)
+        self.reporter.emit("summary", command="login", run_id=run.run_id, total=len(credentials),
+                           already_done=len(run.done), succeeded=login.succeeded, failed=login.failed)
+        if cancelled:
+            return EXIT_CANCELLED
+        return EXIT_FAILURES if login.failed else EXIT_OK
+
+    def balance(self):
+        if not self.config.ez_captcha_key:
+            self.reporter.emit("error", message="EZ-Captcha API key is not set")
+            return EXIT_SETUP
+        try:
+            balance = self.solver.get_balance()
+        except (CaptchaError, requests.RequestException, ValueError) as e:
+            self.reporter.emit("error", message=f"Error checking balance: {str(e)}")
+            return EXIT_FAILURES
+        self.reporter.emit("balance", balance=balance)
+        return EXIT_OK
+
+    def show_history(self, emails, since_hours=None, limit=100):
+        # With emails: the latest checks of those accounts; otherwise every status change in the window
+        if emails:
+            unknown = self.store.missing_emails(emails)
+            if unknown:
+                raise UnknownAccountsError(unknown)
+            for email in emails:
+                entries = self.history.history_for(email, limit or -1)
+                for checked_at, flags, appeal, cookie_expires_at, changed in entries:
+                    if since_hours is not None and checked_at < time.time() - since_hours * 3600:
+                        break
+                    self.reporter.emit("history", email=email, checked_at=checked_at,
+                                       status=status_text(flags, appeal), changed=bool(changed),
+                                       cookie_expires_at=cookie_expires_at)
+            return EXIT_OK
+        changes = self.history.changed_since(int((24 if since_hours is None else since_hours) * 3600))
+        for email, checked_at, flags, appeal in changes[-limit:] if limit else changes:
+            self.reporter.emit("change", email=email, checked_at=checked_at, status=status_text(flags, appeal))
+        self.reporter.emit("summary", command="history", changes=len(changes))
+        return EXIT_OK
+
+    def import_credentials(self, path, file_format=None):
+        credentials = CredentialRegistry(self.store.load_login_credentials())
+
+        def on_progress(bytes_read, total_bytes, summary):
+            self.reporter.emit("progress", completed=bytes_read, total=total_bytes, imported=summary.processed)
+
+        def on_rejected(line, reason, email):
+            self.reporter.emit("rejected", line=line, reason=reason, email=email)
+
+        importer = CredentialImporter(self.store, self.accounts, credentials, self.config.import_batch_size,
+                                      on_progress, on_rejected, self.reporter.log)
+        self.persister.flush()
+        try:
+            file_format = file_format or detect_format(path)
+            summary, cancelled = self.run_cancellable(lambda: importer.run(path, file_format), importer.cancel)
+        except (OSError, json.JSONDecodeError) as e:
+            self.reporter.emit("error", message=f"Error importing {path}: {str(e)}")
+            return EXIT_USAGE
+        except WorkerError as e:
+            if not isinstance(e.__cause__, (OSError, json.JSONDecodeError, ImportFormatError)):
+                raise
+            self.reporter.emit("error", message=f"Error importing {path}: {str(e.__cause__)}")
+            return EXIT_USAGE
+        if summary is None:
+            self.reporter.emit("error", message=f"Import of {path} did not finish")
+            return EXIT_FAILURES
+        self.reporter.emit("summary", command="import", **summary.to_dict())
+        if summary.error:
+            # Batches before the broken part are kept; the file itself needs fixing
+            self.reporter.emit("error", message=f"Error importing {path}: {summary.error}")
+            return EXIT_USAGE
+        if cancelled:
+            return EXIT_CANCELLED
+        return EXIT_FAILURES if summary.rejected else EXIT_OK
+
+    def export(self, emails, output, file_format=None, export_filter=None, columns=None, include_secrets=False):
+        unknown = self.store.missing_emails(emails)
+        if unknown:
+            raise UnknownAccountsError(unknown)
+        export_filter = export_filter or ExportFilter()
+        export_filter.emails = set(emails)
+        export_filter.warning_seconds = self.config.cookie_expiry_warning
+        try:
+            file_format = resolve_export_format(output, file_format)
+            check_output_path(output)
+            exporter = AccountExporter(self.store, export_filter, columns, self.reporter.progress, self.reporter.log,
+                                       include_secrets)
+        except ExportError as e:
+            self.reporter.emit("error", message=str(e))
+            return EXIT_USAGE
+        summary, cancelled = self.run_cancellable(lambda: exporter.run(output, file_format), exporter.cancel)
+        if summary is None:
+            self.reporter.emit("error", message="Export did not finish")
+            return EXIT_FAILURES
+        self.reporter.emit("summary", command="export", output=output, **summary.to_dict())
+        return EXIT_CANCELLED if cancelled else EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run account checks without the GUI.")
+    parser.add_argument("--db", default=ACCOUNTS_DB_FILE_NAME, help="accounts database (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="check ban status and age of accounts")
+    check.add_argument("emails", nargs="*", help="only check these accounts")
+    check.add_argument("--fresh", action="store_true", help="start over instead of resuming an interrupted run")
+    check.add_argument("--all", dest="check_all", action="store_true",
+                       help="check every account, including ones checked recently")
+    validate = commands.add_parser("validate", help="validate SSO cookies, clearing invalid ones")
+    validate.add_argument("emails", nargs="*", help="only validate these accounts")
+    login = commands.add_parser("login", help="log in with stored credentials and refresh SSO cookies")
+    login.add_argument("emails", nargs="*", help="only log in to these accounts")
+    login.add_argument("--fresh", action="store_true", help="start over instead of resuming an interrupted run")
+    monitor = commands.add_parser("monitor", help="keep checking accounts as they fall due and report status changes")
+    monitor.add_argument("--notify-file", help="append status changes to this JSON lines file "
+                                               "(default: the monitor_notify_file setting)")
+    monitor.add_argument("--webhook", help="POST batches of status changes to this URL")
+    monitor.add_argument("--cycles", type=int, help="stop after this many check cycles")
+    history = commands.add_parser("history", help="show recorded status changes, or the check history of accounts")
+    history.add_argument("emails", nargs="*", help="show every recorded check of these accounts instead")
+    history.add_argument("--since", type=float, metavar="HOURS",
+                         help="only checks or changes from the last HOURS (default for changes: 24)")
+    history.add_argument("--limit", type=int, default=100,
+                         help="most recent entries to show per account or in total, 0 for all (default: %(default)s)")
+    import_parser = commands.add_parser("import", help="add or update login credentials from a JSON, JSON lines "
+                                                       "or CSV file")
+    import_parser.add_argument("file", help="file with email and password per entry")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS,
+                               help="file format (default: from the file extension and contents)")
+    commands.add_parser("balance", help="show the EZ-Captcha balance")
+    export = commands.add_parser("export", help="write accounts as JSON lines, CSV or Parquet")
+    export.add_argument("emails", nargs="*", help="only export these accounts")
+    export.add_argument("-o", "--output", help="file to write to (default: stdout)")
+    export.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="output format (default: from the output file extension, otherwise jsonl)")
+    export.add_argument("--status", action="append", default=[],
+                        help="only accounts whose status starts with this text, e.g. 'shadowbanned' (repeatable)")
+    export.add_argument("--platform", action="append", default=[],
+                        help="only accounts on this platform or linked to it: psn, xbl, steam, battle (repeatable)")
+    export.add_argument("--min-age", type=int, help="only accounts at least this many days old")
+    export.add_argument("--max-age", type=int, help="only accounts at most this many days old")
+    export.add_argument("--cookie", action="append", default=[], choices=COOKIE_STATES,
+                        help="only accounts whose SSO cookie is in this state (repeatable)")
+    export.add_argument("--cookie-expires-within", type=float, metavar="HOURS",
+                        help="only accounts whose SSO cookie expires within this many hours or has expired")
+    export.add_argument("--columns", help="comma-separated columns to write (default: all but password and sso_cookie)")
+    export.add_argument("--include-secrets", action="store_true",
+                        help="also write the password and sso_cookie columns, which are left out by default")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Progress goes to stderr when accounts are exported to stdout
+    reporter = JsonLinesReporter(sys.stderr if args.command == "export" and not args.output else sys.stdout)
+    try:
+        runner = BatchRunner(args.db, reporter, load_accounts=args.command not in ("export", "history"))
+    except (OSError, sqlite3.Error, ValueError, json.JSONDecodeError) as e:
+        reporter.emit("error", message=f"Error opening {args.db}: {str(e)}")
+        return EXIT_SETUP
+    try:
+        if args.command == "balance":
+            return runner.balance()
+        if args.command == "export":
+            export_filter = ExportFilter(
+                statuses=args.status, platforms=args.platform, min_age_days=args.min_age, max_age_days=args.max_age,
+                cookie_states=args.cookie,
+                cookie_expires_within=None if args.cookie_expires_within is None else args.cookie_expires_within * 3600)
+            columns = [column.strip() for column in args.columns.split(",")] if args.columns else None
+            return runner.export(args.emails, args.output, args.format, export_filter, columns, args.include_secrets)
+        if args.command == "history":
+            return runner.show_history(args.emails, args.since, args.limit)
+        if args.command == "import":
+            return runner.import_credentials(args.file, args.format)
+        if args.command == "validate":
+            return runner.validate(args.emails)
+        if args.command == "monitor":
+            return runner.monitor(args.notify_file, args.webhook, args.cycles)
+        if args.command == "check":
+            return runner.check(args.emails, args.fresh, args.check_all)
+        return runner.login(args.emails, args.fresh)
+    except UnknownAccountsError as e:
+        reporter.emit("error", message=f"Unknown accounts: {str(e)}")
+        return EXIT_USAGE
+    except WorkerError as e:
+        reporter.emit("error", message=f"{args.command} failed: {str(e)}")
+        return EXIT_FAILURES
+    except KeyboardInterrupt:
+        return EXIT_CANCELLED
+    finally:
+        runner.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import base64
+import time
+
+
+def decode_sso_cookie(sso_cookie):
+    decoded_cookie = base64.b64decode(sso_cookie).decode('utf-8')
+    parts = decoded_cookie.split(':')
+    if len(parts) != 3:
+        raise ValueError("Unexpected cookie format")
+    account_id, expiration_timestamp, hash_value = parts
+    return account_id, int(expiration_timestamp), hash_value
+
+
+def sso_cookie_expiry(sso_cookie):
+    if not sso_cookie:
+        return None
+    try:
+        return decode_sso_cookie(sso_cookie)[1]
+    except ValueError:
+        return None
+
+
+COOKIE_OK = "ok"
+COOKIE_EXPIRING_SOON = "expiring soon"
+COOKIE_EXPIRED = "expired"
+COOKIE_MALFORMED = "malformed"
+COOKIE_MISSING = "missing"
+
+COOKIE_STATES = (COOKIE_OK, COOKIE_EXPIRING_SOON, COOKIE_EXPIRED, COOKIE_MALFORMED, COOKIE_MISSING)
+# States where a captcha or HTTP request can only fail
+DOOMED_COOKIE_STATES = (COOKIE_EXPIRED, COOKIE_MALFORMED, COOKIE_MISSING)
+
+
+def classify_sso_cookie(sso_cookie, warning_seconds, now=None):
+    if not sso_cookie:
+        return COOKIE_MISSING, None
+    try:
+        expires_at = decode_sso_cookie(sso_cookie)[1]
+    except ValueError:
+        return COOKIE_MALFORMED, None
+    now = time.time() if now is None else now
+    if expires_at <= now:
+        return COOKIE_EXPIRED, expires_at
+    if expires_at - now <= warning_seconds:
+        return COOKIE_EXPIRING_SOON, expires_at
+    return COOKIE_OK, expires_at
+
+
+class CookieTriage:
+    def __init__(self, accounts, warning_seconds, now=None):
+        self.groups = {state: [] for state in COOKIE_STATES}
+        for account in accounts:
+            state, _ = classify_sso_cookie(account.sso_cookie, warning_seconds, now)
+            self.groups[state].append(account)
+
+    def checkable(self):
+        return self.groups[COOKIE_OK] + self.groups[COOKIE_EXPIRING_SOON]
+
+    def doomed(self):
+        return [(state, account) for state in DOOMED_COOKIE_STATES for account in self.groups[state]]
+
+    def summary(self):
+        counts = ", ".join(f"{len(self.groups[state])} {state}" for state in COOKIE_STATES)
+        return f"Cookie triage: {counts} ({len(self.doomed())} skipped)"
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from captcha import CaptchaPipeline
+from cookies import COOKIE_EXPIRING_SOON, CookieTriage
+from metrics import METRICS
+
+
+class CheckEngine:
+    def __init__(self, checker, config, on_result=None, on_progress=None, log=print):
+        self.checker = checker
+        self.config = config
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.log = log
+        self.concurrency = max(1, config.check_concurrency)
+        self.total = 0
+        self.completed = 0
+        self.elapsed = 0.0
+        self.metrics_start = None
+
+    def cancel(self):
+        self.checker.cancelled.set()
+        if self.checker.captcha_pipeline is not None:
+            self.checker.captcha_pipeline.close()
+
+    @property
+    def is_cancelled(self):
+        return self.checker.cancelled.is_set()
+
+    def run(self, accounts):
+        return asyncio.run(self.run_async(accounts))
+
+    def triage(self, accounts):
+        triage = CookieTriage(accounts, self.config.cookie_expiry_warning)
+        self.log(triage.summary())
+        for state, account in triage.doomed():
+            self.log(f"{account.email}: skipped, SSO cookie is {state}")
+        for account in triage.groups[COOKIE_EXPIRING_SOON]:
+            self.log(f"{account.email}: SSO cookie is expiring soon")
+        return triage.checkable()
+
+    async def run_async(self, accounts):
+        to_check = self.triage(accounts)
+        self.total = len(to_check)
+        self.completed = 0
+        self.metrics_start = METRICS.snapshot()
+        started = time.monotonic()
+        # A checker reused across runs must not take tokens from the previous run's closed pipeline
+        self.checker.captcha_pipeline = None
+        if len(to_check) > 1:
+            # Keep at least one token in flight per concurrent check
+            depth = max(self.config.captcha_lookahead, self.concurrency)
+            self.checker.captcha_pipeline = CaptchaPipeline(
+                self.checker.solve_status_check_captcha, len(to_check), depth,
+                self.config.captcha_token_ttl, self.checker.solver.stats).start()
+        loop = asyncio.get_running_loop()
+        remaining = iter(to_check)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="check") as executor:
+            async def worker():
+                for account in remaining:
+                    if self.is_cancelled:
+                        return
+                    result = await loop.run_in_executor(executor, self.checker.process, account)
+                    if result is None:
+                        continue
+                    self.completed += 1
+                    if self.on_result is not None:
+                        self.on_result(account, *result)
+                    if self.on_progress is not None:
+                        self.on_progress(self.completed, self.total)
+
+            try:
+                await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(to_check)))))
+            finally:
+                if self.checker.captcha_pipeline is not None:
+                    self.checker.captcha_pipeline.close()
+        self.elapsed = time.monotonic() - started
+        self.log_summary()
+        return self.completed
+
+    def log_summary(self):
+        rate = self.completed / self.elapsed * 60 if self.elapsed else 0.0
+        self.log(f"Checked {self.completed}/{self.total} accounts in {self.elapsed:.1f}s "
+                 f"({rate:.1f} accounts/min, concurrency {self.concurrency})")
+        if self.checker.captcha_pipeline is not None:
+            self.log(self.checker.captcha_pipeline.summary())
+        self.log(self.checker.solver.stats.summary())
+        self.log(self.checker.http.stats.summary())
+        self.log(f"Profile cache: {self.checker.profiles.hits} hits, {self.checker.profiles.misses} fetches")
+        self.log(METRICS.summary(self.metrics_start))
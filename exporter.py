@@ -0,0 +1,290 @@
+import csv
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from cookies import COOKIE_STATES, classify_sso_cookie
+from parsing import PROVIDER_FIELDS
+from settings import COOKIE_EXPIRY_WARNING
+from store import ACCOUNT_COLUMNS, row_dict
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet")
+EXPORT_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv", ".parquet": "parquet"}
+
+# Rows fetched from the database per round trip, and rows per Parquet row group
+EXPORT_FETCH_SIZE = 1000
+PARQUET_ROW_GROUP_SIZE = 10000
+
+COLUMN_INDEX = {column: i for i, column in enumerate(ACCOUNT_COLUMNS)}
+# Columns that let anyone holding the file log in; they are only written when asked for explicitly
+SECRET_COLUMNS = ("password", "sso_cookie")
+DEFAULT_EXPORT_COLUMNS = tuple(column for column in ACCOUNT_COLUMNS if column not in SECRET_COLUMNS)
+AGE_PATTERN = re.compile(r"(\d+) years, (\d+) months, (\d+) days")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def detect_export_format(path):
+    return EXPORT_EXTENSIONS.get(os.path.splitext(path or "")[1].lower(), "jsonl")
+
+
+def resolve_export_format(output, file_format=None):
+    file_format = file_format or detect_export_format(output)
+    if file_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format: {file_format}")
+    if file_format == "parquet":
+        if not output:
+            raise ExportError("Parquet export needs an output file")
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ExportError("Parquet export needs the pyarrow package (pip install pyarrow)")
+    return file_format
+
+
+def check_output_path(output):
+    # Fails before any rows are read instead of after the whole export has been written to a temp file
+    if not output:
+        return
+    directory = os.path.dirname(os.path.abspath(output))
+    if not os.path.isdir(directory):
+        raise ExportError(f"Output directory does not exist: {directory}")
+    if not os.access(directory, os.W_OK):
+        raise ExportError(f"Output directory is not writable: {directory}")
+    if os.path.isdir(output):
+        raise ExportError(f"Output is a directory: {output}")
+
+
+def account_age_days(account_age):
+    # "3 years, 2 months, 5 days" as written by AccountChecker.check_account_age; None when unknown
+    match = AGE_PATTERN.match(account_age or "")
+    if not match:
+        return None
+    years, months, days = (int(part) for part in match.groups())
+    return years * 365 + months * 30 + days
+
+
+class ExportFilter:
+    def __init__(self, emails=(), statuses=(), platforms=(), min_age_days=None, max_age_days=None,
+                 cookie_states=(), cookie_expires_within=None, warning_seconds=COOKIE_EXPIRY_WARNING, now=None):
+        # statuses: case-insensitive prefixes of the first line of last_status ("shadowbanned", "permanently banned",
+        # "account not banned", "failed"), any one may match; a prefix keeps "banned" from matching "not banned"
+        # platforms: the platform column or a linked provider (psn, xbl, steam, battle), any one may match
+        # cookie_expires_within: seconds; cookies already expired match as well
+        self.emails = set(emails)
+        self.statuses = tuple(status.lower() for status in statuses)
+        self.platforms = {platform.lower() for platform in platforms}
+        self.min_age_days = min_age_days
+        self.max_age_days = max_age_days
+        self.cookie_states = set(cookie_states)
+        unknown = self.cookie_states - set(COOKIE_STATES)
+        if unknown:
+            raise ExportError(f"Unknown cookie states: {', '.join(sorted(unknown))}")
+        self.cookie_expires_within = cookie_expires_within
+        self.warning_seconds = warning_seconds
+        self.now = now
+
+    @property
+    def active(self):
+        return bool(self.emails or self.statuses or self.platforms or self.min_age_days is not None
+                    or self.max_age_days is not None or self.cookie_states or self.cookie_expires_within is not None)
+
+    def matches(self, row, now):
+        if self.emails and row[0] not in self.emails:
+            return False
+        if self.statuses:
+            status = (row[COLUMN_INDEX["last_status"]] or "").partition("\n")[0].lower()
+            if not status.startswith(self.statuses):
+                return False
+        if self.platforms and not self.matches_platform(row):
+            return False
+        if self.min_age_days is not None or self.max_age_days is not None:
+            age = account_age_days(row[COLUMN_INDEX["account_age"]])
+            if age is None:
+                return False
+            if self.min_age_days is not None and age < self.min_age_days:
+                return False
+            if self.max_age_days is not None and age > self.max_age_days:
+                return False
+        if self.cookie_states or self.cookie_expires_within is not None:
+            state, expires_at = classify_sso_cookie(row[COLUMN_INDEX["sso_cookie"]], self.warning_seconds, now)
+            if self.cookie_states and state not in self.cookie_states:
+                return False
+            if self.cookie_expires_within is not None and (
+                    expires_at is None or expires_at - now > self.cookie_expires_within):
+                return False
+        return True
+
+    def matches_platform(self, row):
+        if (row[COLUMN_INDEX["platform"]] or "").lower() in self.platforms:
+            return True
+        return any(row[COLUMN_INDEX[field]] for provider, field in PROVIDER_FIELDS.items()
+                   if provider in self.platforms)
+
+
+class JsonLinesExportWriter:
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+
+    def write(self, row):
+        values = row_dict(row)
+        self.stream.write(json.dumps({column: values[column] for column in self.columns}) + "\n")
+
+    def close(self):
+        pass
+
+
+class CsvExportWriter:
+    def __init__(self, stream, columns):
+        # bans stay as the compact JSON text kept in the database
+        self.writer = csv.writer(stream)
+        self.writer.writerow(columns)
+        self.indexes = [COLUMN_INDEX[column] for column in columns]
+
+    def write(self, row):
+        self.writer.writerow([row[i] for i in self.indexes])
+
+    def close(self):
+        pass
+
+
+class ParquetExportWriter:
+    def __init__(self, path, columns, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        # pyarrow is only needed for this format, so the other formats work without it
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.columns = columns
+        self.indexes = [COLUMN_INDEX[column] for column in columns]
+        self.row_group_size = row_group_size
+        self.schema = pyarrow.schema([(column, pyarrow.bool_() if column == "can_appeal" else pyarrow.string())
+                                      for column in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression="zstd")
+        # Only one row group of values is held in memory at a time
+        self.pending = [[] for _ in columns]
+
+    def write(self, row):
+        for values, i in zip(self.pending, self.indexes):
+            values.append(row[i])
+        if len(self.pending[0]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending[0]:
+            return
+        arrays = []
+        for column, values in zip(self.columns, self.pending):
+            if column == "can_appeal":
+                values = [bool(value) for value in values]
+            arrays.append(self.pyarrow.array(values, self.schema.field(column).type))
+        self.writer.write_table(self.pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.pending = [[] for _ in self.columns]
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class ExportSummary:
+    def __init__(self, total):
+        self.total = total
+        self.scanned = 0
+        self.exported = 0
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        return {"total": self.total, "scanned": self.scanned, "exported": self.exported,
+                "cancelled": self.cancelled, "elapsed": round(self.elapsed, 3)}
+
+    def summary(self):
+        text = f"Exported {self.exported} of {self.total} accounts in {self.elapsed:.2f}s"
+        if self.cancelled:
+            text += f" (cancelled after {self.scanned})"
+        return text
+
+
+class AccountExporter:
+    def __init__(self, store, export_filter=None, columns=None, on_progress=None, log=print, include_secrets=False):
+        # Rows stream from the database straight to the writer; no Account objects or result lists are built
+        self.store = store
+        self.export_filter = export_filter or ExportFilter()
+        if not columns:
+            columns = ACCOUNT_COLUMNS if include_secrets else DEFAULT_EXPORT_COLUMNS
+        self.columns = list(columns)
+        unknown = [column for column in self.columns if column not in COLUMN_INDEX]
+        if unknown:
+            raise ExportError(f"Unknown columns: {', '.join(unknown)}")
+        secret = [column for column in self.columns if column in SECRET_COLUMNS]
+        if secret and not include_secrets:
+            raise ExportError(f"{', '.join(secret)} can only be exported with secrets included (--include-secrets)")
+        self.on_progress = on_progress
+        self.log = log
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self, output=None, file_format=None):
+        # output: a file path, or None for stdout (not for Parquet)
+        file_format = resolve_export_format(output, file_format)
+        check_output_path(output)
+        summary = ExportSummary(self.store.count_accounts())
+        started = time.perf_counter()
+        if not output:
+            self.export(JsonLinesExportWriter(sys.stdout, self.columns) if file_format == "jsonl"
+                        else CsvExportWriter(sys.stdout, self.columns), summary)
+        else:
+            # Written next to the target and renamed, so a cancelled or failed export leaves no partial file
+            temp_path = f"{output}.tmp"
+            try:
+                if file_format == "parquet":
+                    self.export(ParquetExportWriter(temp_path, self.columns), summary)
+                else:
+                    with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                        writer = CsvExportWriter(f, self.columns) if file_format == "csv" \
+                            else JsonLinesExportWriter(f, self.columns)
+                        self.export(writer, summary)
+                if summary.cancelled:
+                    os.remove(temp_path)
+                else:
+                    os.replace(temp_path, output)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        summary.elapsed = time.perf_counter() - started
+        self.log(summary.summary())
+        return summary
+
+    def export(self, writer, summary):
+        export_filter = self.export_filter
+        filtered = export_filter.active
+        now = time.time() if export_filter.now is None else export_filter.now
+        try:
+            for row in self.store.iter_account_rows(EXPORT_FETCH_SIZE):
+                if summary.scanned and summary.scanned % EXPORT_FETCH_SIZE == 0:
+                    if self.is_cancelled:
+                        summary.cancelled = True
+                        break
+                    if self.on_progress is not None:
+                        self.on_progress(summary.scanned, summary.total)
+                summary.scanned += 1
+                if filtered and not export_filter.matches(row, now):
+                    continue
+                writer.write(row)
+                summary.exported += 1
+        finally:
+            writer.close()
+        if self.on_progress is not None and not summary.cancelled:
+            self.on_progress(summary.scanned, summary.total)
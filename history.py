@@ -0,0 +1,118 @@
+import threading
+import time
+
+from cookies import sso_cookie_expiry
+from models import APPEAL_CLOSED, APPEAL_OPEN, BAN_OTHER, BAN_PERMANENT, BAN_UNDER_REVIEW
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_history (
+    account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    checked_at INTEGER NOT NULL,
+    flags INTEGER NOT NULL,
+    appeal INTEGER NOT NULL,
+    cookie_expires_at INTEGER,
+    changed INTEGER NOT NULL,
+    PRIMARY KEY (account_id, checked_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS status_history_changes ON status_history (checked_at) WHERE changed = 1;
+"""
+
+
+def status_text(flags, appeal):
+    # The first status line a check with these flags would have produced
+    if flags & BAN_PERMANENT:
+        if appeal == APPEAL_OPEN:
+            return "Permanently banned (Appeal Open)"
+        if appeal == APPEAL_CLOSED:
+            return "Permanently banned (Appeal Denied)"
+        return "Permanently banned"
+    if flags & BAN_UNDER_REVIEW:
+        return "Shadowbanned"
+    if flags & BAN_OTHER:
+        return "Unknown ban status"
+    return "Account not banned"
+
+
+def insert_history(conn, entries):
+    # entries: (email, checked_at, flags, appeal, cookie_expires_at, changed); the account row must exist already
+    conn.executemany(
+        "INSERT OR REPLACE INTO status_history (account_id, checked_at, flags, appeal, cookie_expires_at, changed) "
+        "SELECT id, ?, ?, ?, ?, ? FROM accounts WHERE email = ?",
+        [(checked_at, flags, appeal, cookie_expires_at, changed, email)
+         for email, checked_at, flags, appeal, cookie_expires_at, changed in entries])
+
+
+class StatusHistory:
+    def __init__(self, store, persister=None):
+        # With a persister, rows are queued to its writer thread together with the account row
+        # instead of being written from the check workers
+        self.store = store
+        self.persister = persister
+        with store.transaction() as conn:
+            for statement in SCHEMA.strip().split(";\n"):
+                conn.execute(statement)
+        self._lock = threading.Lock()
+        # email -> (flags, appeal) of the latest record, so change detection never reads the database
+        self._last = {}
+        self.load_latest()
+
+    def load_latest(self):
+        with self.store.transaction() as conn:
+            # SQLite takes the bare columns from the row holding MAX(checked_at)
+            rows = conn.execute(
+                "SELECT a.email, h.flags, h.appeal, MAX(h.checked_at) FROM status_history h "
+                "JOIN accounts a ON a.id = h.account_id GROUP BY h.account_id").fetchall()
+        with self._lock:
+            self._last = {email: (flags, appeal) for email, flags, appeal, _ in rows}
+
+    def record(self, account, checked_at=None):
+        checked_at = int(checked_at if checked_at is not None else time.time())
+        flags = account.ban_flags
+        appeal = account.appeal
+        with self._lock:
+            previous = self._last.get(account.email)
+            self._last[account.email] = (flags, appeal)
+        changed = int(previous is not None and previous != (flags, appeal))
+        entry = (account.email, checked_at, flags, appeal, sso_cookie_expiry(account.sso_cookie), changed)
+        if self.persister is not None:
+            self.persister.mark_dirty(account, history=entry)
+            return bool(changed)
+        if not self.store.is_saved(account.email):
+            # History rows reference the account's id, so the account is written first
+            self.store.save_account(account)
+        with self.store.transaction() as conn:
+            insert_history(conn, [entry])
+        return bool(changed)
+
+    def changed_since(self, seconds):
+        cutoff = int(time.time()) - seconds
+        with self.store.transaction() as conn:
+            return conn.execute(
+                "SELECT a.email, h.checked_at, h.flags, h.appeal FROM status_history h "
+                "JOIN accounts a ON a.id = h.account_id "
+                "WHERE h.changed = 1 AND h.checked_at >= ? ORDER BY h.checked_at", (cutoff,)).fetchall()
+
+    def history_for(self, email, limit=100):
+        with self.store.transaction() as conn:
+            return conn.execute(
+                "SELECT h.checked_at, h.flags, h.appeal, h.cookie_expires_at, h.changed FROM status_history h "
+                "JOIN accounts a ON a.id = h.account_id "
+                "WHERE a.email = ? ORDER BY h.checked_at DESC LIMIT ?", (email, limit)).fetchall()
+
+    def prune(self, retention_days, compact_after_days):
+        now = int(time.time())
+        with self.store.transaction() as conn:
+            expired = conn.execute(
+                "DELETE FROM status_history WHERE checked_at < ?",
+                (now - retention_days * SECONDS_PER_DAY,)).rowcount
+            # Past the full-resolution window keep transitions and the last check of each day
+            thinned = conn.execute(
+                "DELETE FROM status_history WHERE changed = 0 AND checked_at < ? AND EXISTS ("
+                "SELECT 1 FROM status_history later WHERE later.account_id = status_history.account_id "
+                "AND later.checked_at > status_history.checked_at "
+                "AND later.checked_at / ? = status_history.checked_at / ?)",
+                (now - compact_after_days * SECONDS_PER_DAY, SECONDS_PER_DAY, SECONDS_PER_DAY)).rowcount
+        self.load_latest()
+        return expired + thinned
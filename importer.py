@@ -0,0 +1,290 @@
+import csv
+import io
+import json
+import os
+import threading
+
+from models import Account
+from settings import IMPORT_BATCH_SIZE
+from store import account_row
+
+IMPORT_FORMATS = ("json", "jsonl", "csv")
+
+REJECT_MALFORMED = "malformed"
+REJECT_MISSING_EMAIL = "missing email"
+REJECT_INVALID_EMAIL = "invalid email"
+REJECT_MISSING_PASSWORD = "missing password"
+
+# Rejected rows kept for the summary; the rest are only counted
+MAX_REJECTED_SAMPLES = 20
+JSON_CHUNK_SIZE = 64 * 1024
+MAX_JSON_ELEMENT_SIZE = 1024 * 1024
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    # A .json file may still hold one object per line
+    with open(path, "rb") as f:
+        head = f.read(4096).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return "jsonl" if head.startswith(b"{") else "json"
+
+
+def iter_json_array(stream, chunk_size=JSON_CHUNK_SIZE):
+    # Decodes one element at a time, so only the current chunk and element are held in memory
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    index = 0
+    while True:
+        while True:
+            # Skip whitespace and separators between elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                break
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                if not started:
+                    raise ImportFormatError("File is empty")
+                raise ImportFormatError("Unexpected end of file inside the JSON array")
+            buffer = buffer[position:] + chunk
+            position = 0
+        if not started:
+            if buffer[position] != "[":
+                raise ImportFormatError("Expected a JSON array of credentials")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # An element that is still incomplete after this much text is broken, not cut off by a chunk
+                chunk = stream.read(chunk_size) if len(buffer) - position < MAX_JSON_ELEMENT_SIZE else ""
+                if not chunk:
+                    raise ImportFormatError(f"Invalid JSON in element {index + 1}: {e.msg}")
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            # A number cut off at the chunk boundary decodes fine, so make sure the element really ended
+            if end == len(buffer):
+                chunk = stream.read(chunk_size)
+                if chunk:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+            break
+        index += 1
+        yield index, value
+        position = end
+
+
+def iter_json_lines(stream):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None
+
+
+def iter_csv(stream):
+    # With a header row the email and password columns are found by name, otherwise they are the first two
+    reader = csv.reader(stream)
+    email_column, password_column = 0, 1
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        header = [cell.strip().lower() for cell in row]
+        if "email" in header:
+            email_column = header.index("email")
+            password_column = header.index("password") if "password" in header else -1
+            break
+        yield reader.line_num, {"email": row[0], "password": row[1] if len(row) > 1 else None}
+        break
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, {
+            "email": row[email_column] if email_column < len(row) else None,
+            "password": row[password_column] if 0 <= password_column < len(row) else None,
+        }
+
+
+RECORD_READERS = {"json": iter_json_array, "jsonl": iter_json_lines, "csv": iter_csv}
+
+
+def validate_record(record):
+    # -> (email, password, None) or (None, None, reason)
+    if not isinstance(record, dict):
+        return None, None, REJECT_MALFORMED
+    email = record.get("email")
+    password = record.get("password")
+    email = email.strip() if isinstance(email, str) else ""
+    if not email:
+        return None, None, REJECT_MISSING_EMAIL
+    if "@" not in email or " " in email:
+        return None, None, REJECT_INVALID_EMAIL
+    if not isinstance(password, str) or not password:
+        return None, None, REJECT_MISSING_PASSWORD
+    return email, password, None
+
+
+class ImportSummary:
+    def __init__(self):
+        self.added = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.reasons = {}
+        self.samples = []
+        self.batches = 0
+        self.cancelled = False
+        self.error = None
+
+    @property
+    def processed(self):
+        return self.added + self.updated + self.unchanged + self.rejected
+
+    def reject(self, line, reason, email=None):
+        self.rejected += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        if len(self.samples) < MAX_REJECTED_SAMPLES:
+            self.samples.append((line, reason, email))
+
+    def to_dict(self):
+        return {"added": self.added, "updated": self.updated, "unchanged": self.unchanged,
+                "rejected": self.rejected, "reasons": self.reasons, "cancelled": self.cancelled,
+                "error": self.error}
+
+    def summary(self):
+        text = (f"Imported credentials: {self.added} added, {self.updated} updated, {self.unchanged} unchanged, "
+                f"{self.rejected} rejected")
+        if self.reasons:
+            text += " (" + ", ".join(f"{reason}: {count}" for reason, count in sorted(self.reasons.items())) + ")"
+        if self.cancelled:
+            text += ", cancelled"
+        if self.error:
+            text += f", stopped: {self.error}"
+        return text
+
+
+class CredentialImporter:
+    def __init__(self, store, accounts, credentials, batch_size=IMPORT_BATCH_SIZE, on_progress=None,
+                 on_rejected=None, log=print):
+        # on_progress(bytes_read, total_bytes, summary) runs after every committed batch
+        self.store = store
+        self.accounts = accounts
+        self.credentials = credentials
+        self.batch_size = max(1, batch_size)
+        self.on_progress = on_progress
+        self.on_rejected = on_rejected
+        self.log = log
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def build_index(self):
+        # Case-insensitive email -> stored email, so "User@x.com" updates the existing "user@x.com"
+        index = {}
+        for cred in self.credentials:
+            index.setdefault(cred.email.casefold(), cred.email)
+        for email in self.accounts.emails():
+            index[email.casefold()] = email
+        return index
+
+    def run(self, path, file_format=None):
+        file_format = file_format or detect_format(path)
+        if file_format not in RECORD_READERS:
+            raise ImportFormatError(f"Unknown import format: {file_format}")
+        summary = ImportSummary()
+        index = self.build_index()
+        total_bytes = os.path.getsize(path)
+        with open(path, "rb") as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            records = RECORD_READERS[file_format](stream)
+            batch = {}
+            try:
+                for line, record in records:
+                    if self.is_cancelled:
+                        summary.cancelled = True
+                        break
+                    email, password, reason = validate_record(record)
+                    if reason:
+                        rejected_email = record.get("email") if isinstance(record, dict) else None
+                        summary.reject(line, reason, rejected_email)
+                        if self.on_rejected is not None:
+                            self.on_rejected(line, reason, rejected_email)
+                        continue
+                    email = index.setdefault(email.casefold(), email)
+                    # A later row for the same email replaces the earlier one in this batch
+                    batch[email] = password
+                    if len(batch) >= self.batch_size:
+                        self.commit(batch, summary)
+                        batch = {}
+                        self.report(raw.tell(), total_bytes, summary)
+            except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+                summary.error = str(e)
+            if batch:
+                self.commit(batch, summary)
+            self.report(raw.tell(), total_bytes, summary)
+        self.log(summary.summary())
+        return summary
+
+    def commit(self, batch, summary):
+        # Registries and counts only change once the batch is on disk, so a failed batch leaves no trace
+        new_accounts = []
+        changed_passwords = []
+        changed_credentials = []
+        rows = []
+        updated = unchanged = 0
+        for email, password in batch.items():
+            account = self.accounts.get(email)
+            cred = self.credentials.get(email)
+            if account is None:
+                account = Account(email, "", "", "", password)
+                new_accounts.append(account)
+                rows.append(account_row(account))
+            elif account.password != password or cred is None or cred.password != password:
+                if account.password != password:
+                    changed_passwords.append((account, password))
+                    row = account_row(account)
+                    rows.append(row[:4] + (password,) + row[5:])
+                updated += 1
+            else:
+                unchanged += 1
+            if cred is None or cred.password != password:
+                changed_credentials.append((email, password))
+        self.store.save_rows_and_credentials(rows, changed_credentials)
+        for account in new_accounts:
+            self.accounts.add(account)
+        for account, password in changed_passwords:
+            account.password = password
+        for email, password in changed_credentials:
+            self.credentials.upsert(email, password)
+        summary.added += len(new_accounts)
+        summary.updated += updated
+        summary.unchanged += unchanged
+        summary.batches += 1
+
+    def report(self, bytes_read, total_bytes, summary):
+        if self.on_progress is not None:
+            self.on_progress(min(bytes_read, total_bytes), total_bytes, summary)
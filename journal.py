@@ -0,0 +1,103 @@
+import time
+import uuid
+
+RUN_RUNNING = "running"
+RUN_FINISHED = "finished"
+RUN_CANCELLED = "cancelled"
+RUN_ABANDONED = "abandoned"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    finished_at INTEGER,
+    total INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_checkpoints (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    completed_at INTEGER NOT NULL,
+    PRIMARY KEY (run_id, email)
+) WITHOUT ROWID;
+"""
+
+
+class Run:
+    def __init__(self, run_id, kind, total, done=(), resumed=False):
+        self.run_id = run_id
+        self.kind = kind
+        self.total = total
+        self.done = set(done)
+        self.resumed = resumed
+
+    def pending(self, items, key=lambda item: item.email):
+        return [item for item in items if key(item) not in self.done]
+
+    def checkpoint(self, email):
+        return (self.run_id, email, int(time.time()))
+
+    def summary(self):
+        if not self.resumed:
+            return f"Run {self.run_id}: {self.total} accounts"
+        return (f"Run {self.run_id} resumed: skipping {len(self.done)} of {self.total} accounts "
+                f"already done, {self.total - len(self.done)} left")
+
+    def final_summary(self, completed, cancelled=False):
+        state = "cancelled, can be resumed" if cancelled else "finished"
+        return (f"Run {self.run_id} {state}: {completed} accounts done in this session, "
+                f"{len(self.done)} carried over from earlier sessions")
+
+
+class RunJournal:
+    def __init__(self, store):
+        # Checkpoints are appended only after the account row they describe has been saved
+        self.store = store
+        with store.transaction() as conn:
+            for statement in SCHEMA.strip().split(";\n"):
+                conn.execute(statement)
+
+    def unfinished(self, kind):
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT r.run_id, r.total, r.started_at, COUNT(c.email) FROM runs r "
+                "LEFT JOIN run_checkpoints c ON c.run_id = r.run_id "
+                "WHERE r.kind = ? AND r.state IN (?, ?) GROUP BY r.run_id "
+                "ORDER BY r.started_at DESC LIMIT 1", (kind, RUN_RUNNING, RUN_CANCELLED)).fetchone()
+        if row is None:
+            return None
+        run_id, total, started_at, done = row
+        return {"run_id": run_id, "total": total, "started_at": started_at, "done": done}
+
+    def start(self, kind, emails, resume_run_id=None):
+        emails = set(emails)
+        with self.store.transaction() as conn:
+            if resume_run_id is not None:
+                done = {email for (email,) in conn.execute(
+                    "SELECT email FROM run_checkpoints WHERE run_id = ?", (resume_run_id,))}
+                conn.execute("UPDATE runs SET state = ?, total = ? WHERE run_id = ?",
+                             (RUN_RUNNING, len(emails), resume_run_id))
+                return Run(resume_run_id, kind, len(emails), done & emails, resumed=True)
+            # Starting over: earlier interrupted runs of this kind can no longer be resumed
+            conn.execute("UPDATE runs SET state = ?, finished_at = ? WHERE kind = ? AND state IN (?, ?)",
+                         (RUN_ABANDONED, int(time.time()), kind, RUN_RUNNING, RUN_CANCELLED))
+            conn.execute("DELETE FROM run_checkpoints WHERE run_id IN (SELECT run_id FROM runs WHERE state = ?)",
+                         (RUN_ABANDONED,))
+            run_id = f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            conn.execute("INSERT INTO runs (run_id, kind, started_at, total, state) VALUES (?, ?, ?, ?, ?)",
+                         (run_id, kind, int(time.time()), len(emails), RUN_RUNNING))
+        return Run(run_id, kind, len(emails))
+
+    def append(self, checkpoints):
+        with self.store.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO run_checkpoints (run_id, email, completed_at) VALUES (?, ?, ?)",
+                             checkpoints)
+
+    def finish(self, run, cancelled=False):
+        with self.store.transaction() as conn:
+            conn.execute("UPDATE runs SET state = ?, finished_at = ? WHERE run_id = ?",
+                         (RUN_CANCELLED if cancelled else RUN_FINISHED, int(time.time()), run.run_id))
+            if not cancelled:
+                # A finished run is never resumed, so its checkpoints are no longer needed
+                conn.execute("DELETE FROM run_checkpoints WHERE run_id = ?", (run.run_id,))
@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from settings import LOG_BACKUP_COUNT, LOG_FILE_NAME, LOG_MAX_BYTES, LOG_MAX_LINES
+
+
+def format_entry(entry):
+    return f"[{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['time']))}] {entry['message']}"
+
+
+class LogPipeline:
+    def __init__(self, path=LOG_FILE_NAME, max_lines=LOG_MAX_LINES, max_bytes=LOG_MAX_BYTES,
+                 backup_count=LOG_BACKUP_COUNT):
+        # Safe to call write() from any thread; the UI drains batches and a background thread writes the file
+        self.path = path
+        self.session = uuid.uuid4().hex[:12]
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._pending = deque(maxlen=max_lines)
+        self.dropped = 0
+        self._file_queue = queue.Queue()
+        self._handler = None
+        if path:
+            self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                encoding="utf-8", delay=True)
+            self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+            self._writer.start()
+
+    def write(self, message, level="info"):
+        entry = {"time": time.time(), "level": level, "session": self.session, "message": message}
+        with self._lock:
+            if len(self._pending) == self.max_lines:
+                self.dropped += 1
+            self._pending.append(entry)
+        if self._handler is not None:
+            self._file_queue.put(entry)
+        return entry
+
+    def drain(self):
+        with self._lock:
+            entries = list(self._pending)
+            self._pending.clear()
+        return entries
+
+    def flush(self):
+        if self._handler is not None:
+            self._file_queue.join()
+
+    def close(self):
+        if self._handler is not None:
+            self._file_queue.put(None)
+            self._writer.join()
+            self._handler.close()
+            self._handler = None
+
+    def session_entries(self):
+        # Oldest backup first, so entries come out in the order they were written
+        if self._handler is None:
+            return
+        self.flush()
+        paths = [f"{self.path}.{i}" for i in range(self._handler.backupCount, 0, -1)] + [self.path]
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("session") == self.session:
+                        yield entry
+
+    def save(self, file_name):
+        count = 0
+        with open(file_name, "w", encoding="utf-8") as f:
+            for entry in self.session_entries():
+                f.write(format_entry(entry) + "\n")
+                count += 1
+        return count
+
+    def _write_loop(self):
+        while True:
+            entry = self._file_queue.get()
+            try:
+                if entry is None:
+                    return
+                self._handler.emit(logging.makeLogRecord({"msg": json.dumps(entry)}))
+            finally:
+                self._file_queue.task_done()
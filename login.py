@@ -0,0 +1,209 @@
+import json
+
+import requests
+import undetected_chromedriver as uc
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import BrowserPool
+from captcha import CaptchaError
+from metrics import METRICS, PHASE_CHROME_LAUNCH, PHASE_LOGIN
+from models import Account
+from parsing import parse_profile
+from settings import LOGIN_TIMEOUT, PROFILE_URL, SUPPORT_URL
+
+
+class AccountLogin:
+    def __init__(self, login_credentials, accounts, config, http, profiles, solver, save_account=None,
+                 on_result=None, on_progress=None, log=print, run=None):
+        self.login_credentials = login_credentials
+        self.accounts = accounts
+        self.config = config
+        self.http = http
+        self.profiles = profiles
+        self.solver = solver
+        self.save_account = save_account
+        self.run_record = run
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.log = log
+        self.is_cancelled = False
+        self.browser_pool = None
+        self.succeeded = 0
+        self.failed = 0
+
+        self.DRIVER = "chromedriver/chromedriver.exe"
+        self.CHROME = "chrome/chrome.exe"
+
+    def run(self):
+        credentials = list(self.login_credentials)
+        if self.run_record is not None:
+            self.log(self.run_record.summary())
+            credentials = self.run_record.pending(credentials)
+        total_accounts = len(credentials)
+        if not total_accounts:
+            return 0
+        metrics_start = METRICS.snapshot()
+        self.browser_pool = BrowserPool(self.launch_browser, min(self.config.browser_pool_size, total_accounts),
+                                        self.config.browser_max_uses, self.prepare_browser, log=self.log)
+        # Chrome processes are closed even when a launch, journal or store error escapes the loop
+        try:
+            self.browser_pool.warm()
+            for i, cred in enumerate(credentials):
+                if self.is_cancelled:
+                    break
+                success = False
+                try:
+                    self.log(f"Logging in for account: {cred.email}")
+                    with METRICS.timer(PHASE_LOGIN):
+                        success, account_info = self.perform_login(cred)
+                    if success:
+                        account = self.update_account(account_info)
+                        if self.save_account is not None and self.run_record is not None:
+                            self.save_account(account, self.run_record.checkpoint(cred.email))
+                        elif self.save_account is not None:
+                            self.save_account(account)
+                        self.log(f"Successfully logged in and updated info for {cred.email}")
+                    else:
+                        self.log(f"Failed to log in for {cred.email}")
+                except Exception as e:
+                    self.log(f"Error processing account {cred.email}: {str(e)}")
+                finally:
+                    if success:
+                        self.succeeded += 1
+                    else:
+                        self.failed += 1
+                    METRICS.inc("logins", result="ok" if success else "failed")
+                    if self.on_result is not None:
+                        self.on_result(cred, success)
+                    if self.on_progress is not None:
+                        self.on_progress(i + 1, total_accounts)
+        finally:
+            self.browser_pool.close()
+        self.log(self.browser_pool.summary())
+        self.log(self.solver.stats.summary())
+        self.log(METRICS.summary(metrics_start))
+        return self.succeeded
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def launch_browser(self):
+        options = uc.ChromeOptions()
+        options.binary_location = self.CHROME
+        if self.config.extra_options_mode:
+            options.add_argument('--start-minimized')
+            #options.add_argument('--enable-fast-unload')
+            #options.add_argument('--disable-gpu')
+            #options.add_argument('--enable-precache')
+            #options.add_argument('--allow-cross-origin-auth-prompt')
+            #options.add_argument('--disable-low-res-tiling')
+            #options.add_argument('--no-sandbox')
+            #options.add_argument('--enable-automation')
+            #options.add_argument('--disable-blink-features=AutomationControlled')
+            #options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--window-size=200,100')
+        with METRICS.timer(PHASE_CHROME_LAUNCH):
+            return uc.Chrome(options=options, driver_executable_path=self.DRIVER)
+
+    def prepare_browser(self, driver):
+        driver.get(SUPPORT_URL)
+
+    def browser_alive(self, driver):
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def perform_login(self, cred):
+        browser = self.browser_pool.acquire()
+        driver = browser.driver
+        try:
+            if not driver.current_url.startswith(SUPPORT_URL):
+                driver.get(SUPPORT_URL)
+            login_link = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ".log-in-link"))
+            )
+            login_link.click()
+            WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.ID, "username")))
+            driver.find_element(By.ID, "username").send_keys(cred.email)
+            driver.find_element(By.ID, "password").send_keys(cred.password)
+            captcha_response = self.solve_login_captcha()
+            if not captcha_response:
+                self.log("Failed to solve captcha")
+                return False, None
+            driver.execute_script(
+                f"""
+                document.getElementById('g-recaptcha-response').innerHTML = '{captcha_response}';
+                grecaptcha.getResponse = function() {{ return '{captcha_response}'; }};
+            """
+            )
+            login_button = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.ID, "login-button")))
+            login_button.click()
+            WebDriverWait(driver, LOGIN_TIMEOUT).until(EC.url_contains("support.activision.com"))
+            sso_cookie = self.get_sso_cookie(driver)
+            if not sso_cookie:
+                self.log("Failed to retrieve SSO cookie")
+                return False, None
+            profile_data = self.get_profile_data(driver)
+            if self.profiles is not None and profile_data.get("email"):
+                self.profiles.put(profile_data["email"], sso_cookie, profile_data)
+            return True, self.extract_account_info(profile_data, sso_cookie)
+        except Exception as e:
+            self.log(f"An error occurred during login: {str(e)}")
+            return False, None
+        finally:
+            self.browser_pool.release(browser, self.browser_alive(driver))
+
+    def get_sso_cookie(self, driver):
+        all_cookies = driver.get_cookies()
+        return next(
+           (
+                cookie["value"]
+                for cookie in all_cookies
+                if cookie["name"] == "ACT_SSO_COOKIE"
+            ),
+            None,
+        )
+    def get_profile_data(self, driver):
+        driver.get(PROFILE_URL)
+        return json.loads(driver.find_element(By.TAG_NAME, "body").text)
+    
+    def extract_account_info(self, profile_data, sso_cookie):
+        profile = parse_profile(profile_data)
+        return {
+            "email": profile.email,
+            "username": profile.username,
+            "uno_id": profile.uno_id,
+            "sso_cookie": sso_cookie,
+        }
+    def update_account(self, account_info):
+        existing_account = self.accounts.get(account_info["email"])
+        if existing_account:
+            self.accounts.update(existing_account,
+                                 username=account_info["username"],
+                                 uno_id=account_info["uno_id"],
+                                 sso_cookie=account_info["sso_cookie"])
+            return existing_account
+        else:
+            new_account = Account(
+                account_info["email"],
+                account_info["username"],
+                account_info["uno_id"],
+                account_info["sso_cookie"]
+            )
+            self.accounts.add(new_account)
+            return new_account
+
+    def solve_login_captcha(self):
+        try:
+            return self.solver.solve(self.config.login_url, self.config.login_site_key)
+        except CaptchaError as e:
+            self.log(str(e))
+        except requests.RequestException as e:
+            self.log(f"HTTP error occurred: {e}")
+        except Exception as e:
+            self.log(f"Error solving captcha: {str(e)}")
+        return None
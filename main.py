@@ -1,85 +1,47 @@
 import os
-import base64
-import json
+import sqlite3
 import sys
-import time
-from datetime import datetime, timezone
-import iso8601
 import requests
-import undetected_chromedriver as uc
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import (
     QInputDialog, QAction, QDialog, QFormLayout, QLineEdit, QDialogButtonBox,
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QTextEdit,
-    QLabel, QListWidget, QMessageBox, QProgressDialog, QFileDialog, QGroupBox, QDockWidget, QGridLayout
+    QLabel, QMessageBox, QProgressDialog, QFileDialog, QGroupBox, QDockWidget, QGridLayout,
+    QPlainTextEdit, QTableView, QHeaderView, QAbstractItemView, QSpinBox, QComboBox, QCheckBox
 )
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+from models import Account
+from registry import AccountRegistry, CredentialRegistry
+from settings import (
+    Config, ACCOUNTS_DB_FILE_NAME, ACCOUNTS_FILE_NAME, CONFIG_FILE_NAME, LOGIN_CREDENTIALS_FILE_NAME,
+    LOG_FILE_NAME, LOG_FLUSH_INTERVAL_MS, LOG_MAX_LINES
+)
+from store import AccountStore
+from history import StatusHistory
+from importer import CredentialImporter
+from exporter import (
+    AccountExporter, ExportError, ExportFilter, check_output_path, detect_export_format, resolve_export_format
+)
+from sessions import SessionPool
+from profiles import ProfileCache
+from validation import CookieValidator
+from cookies import COOKIE_EXPIRING_SOON, COOKIE_STATES, CookieTriage
+from captcha import CaptchaError, CaptchaSolver, EzCaptchaProvider
+from checker import AccountChecker
+from engine import CheckEngine
+from log_pipeline import LogPipeline, format_entry
+from account_model import AccountTableModel
+from parsing import PROVIDER_FIELDS
+from persister import AccountPersister
+from journal import RunJournal
+from scheduler import CheckScheduler
+from monitor import StatusMonitor, build_notifier
+from metrics import METRICS, MetricsExporter
 
-# Constants
-#CHROME = os.path.join(os.path.dirname(sys.executable), "chrome", "chrome.exe")
-#DRIVER = os.path.join(os.path.dirname(sys.executable), "chromedriver", "chromedriver.exe")
 icon_path = os.path.abspath('icon.ico')
-CONFIG_FILE_NAME = "config.json"
-ACCOUNTS_FILE_NAME = "accounts.json"
-EZ_CAPTCHA_APP_ID = 84291
-CHROME = "chrome/chrome.exe"
-DRIVER = "chromedriver/chromedriver.exe"
-LOGIN_CREDENTIALS_FILE_NAME = "login_credentials.json"
-EZ_CAPTCHA_API_URL = "https://api.ez-captcha.com/createTask"
-EZ_CAPTCHA_RESULT_URL = "https://api.ez-captcha.com/getTaskResult"
-EZ_CAPTCHA_BALANCE_URL = "https://api.ez-captcha.com/getBalance"
-ACCOUNT_CHECK_URL = "https://support.activision.com/api/bans/v2/appeal?locale=en"
-PROFILE_URL = "https://support.activision.com/api/profile"
-LOGIN_URL = "https://s.activision.com/do_login?new_SiteId=activision"
-SUPPORT_URL = "https://support.activision.com"
-LOGIN_SITE_KEY = "6LfjPWwbAAAAAKhf5D1Ag5nIS-QO2M4rX52LcnDt"
-STATUS_SITE_KEY = "6LdB2NUpAAAAANcdcy9YcjBOBD4rY-TIHOeolkkk"
-LOGIN_TIMEOUT = 120
-CAPTCHA_TIMEOUT = 120
-
-class Config:
-    def __init__(self, ez_captcha_key="", login_site_key=LOGIN_SITE_KEY, status_site_key=STATUS_SITE_KEY,
-                 login_url=LOGIN_URL, page_url=SUPPORT_URL, extra_options_mode=False):
-        self.ez_captcha_key = ez_captcha_key
-        self.login_site_key = login_site_key
-        self.status_site_key = status_site_key
-        self.login_url = login_url
-        self.page_url = page_url
-        self.extra_options_mode = extra_options_mode
-
-class Account:
-    def __init__(self, email, username, uno_id, sso_cookie, password="", platform="", last_status=""):
-        self.email = email
-        self.username = username
-        self.uno_id = uno_id
-        self.sso_cookie = sso_cookie
-        self.password = password
-        self.platform = platform
-        self.last_status = last_status
-        self.last_check_time = None
-        self.account_age = "Unknown"
-        self.psn_id = None
-        self.xbl_id = None
-        self.steam_id = None
-        self.battle_id = None
-        self.bans = []
-
-    def add_status(self, status):
-        timestamp = datetime.now().isoformat()
-        self.last_status = status
-        self.last_check_time = timestamp
-
-    def update_status(self, status):
-        self.last_status = status
-        self.last_check_time = datetime.now().isoformat()
-
-class LoginCredentials:
-    def __init__(self, email, password):
-        self.email = email
-        self.password = password
+# MainWindow attributes holding background threads, all of which have cancel()
+WORKER_THREADS = ("check_accounts_thread", "validate_thread", "login_thread", "monitor_thread", "import_thread",
+                  "export_thread")
 
 class AddAccountDialog(QDialog):
     def __init__(self):
@@ -116,6 +78,52 @@ class AddAccountDialog(QDialog):
             "sso_cookie": self.sso_cookie_input.text(),
         }
 
+class ExportDialog(QDialog):
+    def __init__(self):
+        super ().__init__()
+        self.setWindowTitle("Export Accounts")
+        self.setModal(True)
+        layout = QFormLayout(self)
+        self.status_input = QLineEdit(self)
+        self.status_input.setPlaceholderText("e.g. Shadowbanned, Permanently banned (comma-separated, optional)")
+        self.platform_input = QLineEdit(self)
+        self.platform_input.setPlaceholderText("e.g. psn, xbl, steam, battle (comma-separated, optional)")
+        self.min_age_input = QSpinBox(self)
+        self.max_age_input = QSpinBox(self)
+        self.expires_within_input = QSpinBox(self)
+        for spin_box in (self.min_age_input, self.max_age_input, self.expires_within_input):
+            spin_box.setRange(0, 100000)
+            spin_box.setSpecialValueText("Any")
+        self.cookie_state_input = QComboBox(self)
+        self.cookie_state_input.addItems(("Any",) + COOKIE_STATES)
+        self.include_secrets_input = QCheckBox("Include passwords and SSO cookies", self)
+        layout.addRow("Status starts with:", self.status_input)
+        layout.addRow("Platform:", self.platform_input)
+        layout.addRow("Minimum age (days):", self.min_age_input)
+        layout.addRow("Maximum age (days):", self.max_age_input)
+        layout.addRow("SSO cookie:", self.cookie_state_input)
+        layout.addRow("Cookie expires within (hours):", self.expires_within_input)
+        layout.addRow(self.include_secrets_input)
+        helper_text = QLabel("Anyone with a file that includes passwords or SSO cookies can log in to the accounts")
+        helper_text.setStyleSheet("color: gray; font-size: 10px;")
+        layout.addRow(helper_text)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_filter(self, warning_seconds):
+        cookie_state = self.cookie_state_input.currentText()
+        return ExportFilter(
+            statuses=[text.strip() for text in self.status_input.text().split(",") if text.strip()],
+            platforms=[text.strip() for text in self.platform_input.text().split(",") if text.strip()],
+            min_age_days=self.min_age_input.value() or None,
+            max_age_days=self.max_age_input.value() or None,
+            cookie_states=() if cookie_state == "Any" else (cookie_state,),
+            cookie_expires_within=self.expires_within_input.value() * 3600 or None,
+            warning_seconds=warning_seconds,
+        )
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -127,9 +135,24 @@ class MainWindow(QMainWindow):
         main_layout = QHBoxLayout(central_widget)
         
         left_layout = QVBoxLayout ()
-        self.account_list = QListWidget()
-        self.account_list.itemClicked.connect(self.display_account_details)
+        self.account_model = AccountTableModel(accounts, config.cookie_expiry_warning, self)
+        self.account_list = QTableView()
+        self.account_list.setModel(self.account_model)
+        self.account_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.account_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.account_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.account_list.setSortingEnabled(True)
+        self.account_list.setWordWrap(False)
+        self.account_list.verticalHeader().hide()
+        # Fixed row heights let the view skip measuring rows it does not show
+        self.account_list.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.account_list.horizontalHeader().setStretchLastSection(True)
+        self.account_list.clicked.connect(self.display_account_details)
+        self.account_filter = QLineEdit()
+        self.account_filter.setPlaceholderText("Filter by email, status or platform")
+        self.account_filter.textChanged.connect(self.account_model.set_filter)
         left_layout.addWidget(QLabel("Accounts:"))
+        left_layout.addWidget(self.account_filter)
         left_layout.addWidget(self.account_list)
         
         right_layout = QVBoxLayout()
@@ -157,9 +180,11 @@ class MainWindow(QMainWindow):
         check_all_btn = QPushButton("Check All Accounts")
         validate_cookies_btn = QPushButton("Validate SSO Cookies")
         login_update_btn = QPushButton("Login and Update SSO Cookies")
+        self.monitor_btn = QPushButton("Start Monitor")
         bulk_ops_layout.addWidget(check_all_btn, 0, 0, 1, 2)
         bulk_ops_layout.addWidget(validate_cookies_btn, 1, 0, 1, 2)
         bulk_ops_layout.addWidget(login_update_btn, 2, 0, 1, 2)
+        bulk_ops_layout.addWidget(self.monitor_btn, 3, 0, 1, 2)
 
         utility_group = QGroupBox("Utility Functions")
         utility_layout = QGridLayout(utility_group)
@@ -187,15 +212,38 @@ class MainWindow(QMainWindow):
         check_all_btn.clicked.connect(self.run_check_accounts)
         validate_cookies_btn.clicked.connect(self.validate_sso_cookies)
         login_update_btn.clicked.connect(self.login_and_update_sso)
+        self.monitor_btn.clicked.connect(self.toggle_monitor)
         check_balance_btn.clicked.connect(self.run_check_captcha_balance)
         refresh_accounts_btn.clicked.connect(self.refresh_accounts)
         
+        # Accounts are loaded after the first paint, so startup time does not grow with the account list
+        self.data_loaded = False
+        self.setEnabled(False)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.data_loaded:
+            self.data_loaded = True
+            QTimer.singleShot(0, self.load_data)
+
+    def load_data(self):
+        self.store = AccountStore(ACCOUNTS_DB_FILE_NAME)
+        self.journal = RunJournal(self.store)
+        self.persister = AccountPersister(self.store, journal=self.journal, log=self.log)
+        self.migrate_json_files()
         self.load_config ()
-        if not self.check_api_key ():
-            self.get_api_key ()
+        self.metrics_exporter = MetricsExporter(METRICS, config.metrics_file, config.metrics_interval,
+                                                config.metrics_port, self.log)
+        self.history = StatusHistory(self.store, self.persister)
+        self.prune_status_history()
+        self.profiles = ProfileCache(http_pool, self.store, config.profile_cache_ttl, config.profile_url)
+        self.profiles.prune()
         self.load_accounts ()
         self.load_login_credentials ()
         self.update_account_list ()
+        self.setEnabled(True)
+        if not self.check_api_key ():
+            self.get_api_key ()
     
     def setup_menu ( self ):
         menubar = self.menuBar ()
@@ -204,15 +252,18 @@ class MainWindow(QMainWindow):
         self.toggle_log_action = QAction("Show Log Window", self, checkable=True)
         self.toggle_log_action.setChecked(False)
         load_credentials_action = QAction ("Load Credentials from File", self)
+        export_accounts_action = QAction ("Export Accounts...", self)
         save_log_action = QAction ("Save Log", self)
         extra_options_mode = QAction ("Extra Options Mode", self, checkable = True)
         change_api_key_action = QAction ("Change API Key", self)
         change_api_key_action.triggered.connect (self.get_api_key)
         self.toggle_log_action.triggered.connect (self.toggle_log_window)
         load_credentials_action.triggered.connect (self.load_credentials_from_file)
+        export_accounts_action.triggered.connect (self.export_accounts)
         save_log_action.triggered.connect (self.save_log)
         extra_options_mode.triggered.connect (self.toggle_extra_options_mode)
         file_menu.addAction (load_credentials_action)
+        file_menu.addAction (export_accounts_action)
         file_menu.addAction(save_log_action)
         settings_menu.addAction (self.toggle_log_action)
         settings_menu.addAction(change_api_key_action)
@@ -229,17 +280,50 @@ class MainWindow(QMainWindow):
 
     def create_log_window(self):
         self.log_dock = QDockWidget("Log", self)
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(LOG_MAX_LINES)
         self.log_dock.setWidget(self.log_text)
         self.addDockWidget(Qt.BottomDockWidgetArea, self.log_dock)
         self.log_dock.hide()
+        self.log_pipeline = LogPipeline()
+        self.log_dropped = 0
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log_view)
+        self.log_timer.start(LOG_FLUSH_INTERVAL_MS)
+
+    def flush_log_view(self):
+        entries = self.log_pipeline.drain()
+        if self.log_pipeline.dropped != self.log_dropped:
+            skipped = self.log_pipeline.dropped - self.log_dropped
+            self.log_dropped = self.log_pipeline.dropped
+            self.log_text.appendPlainText(f"... {skipped} older lines not shown (see {LOG_FILE_NAME})")
+        if entries:
+            self.log_text.appendPlainText("\n".join(format_entry(entry) for entry in entries))
+
+    def closeEvent(self, event):
+        # Workers still hand results to the persister, so they are stopped before its last flush
+        workers = [getattr(self, name, None) for name in WORKER_THREADS]
+        workers = [worker for worker in workers if worker is not None and worker.isRunning()]
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            worker.wait()
+        if hasattr(self, "persister"):
+            self.persister.close()
+            self.log(self.persister.summary())
+        if hasattr(self, "metrics_exporter"):
+            self.metrics_exporter.close()
+        self.log_timer.stop()
+        self.log_pipeline.close()
+        super().closeEvent(event)
 
     def add_account(self):
         dialog = AddAccountDialog ()
         if dialog.exec_():
             account_info = dialog.get_account_info()
-            existing_account = next((acc for acc in accounts if acc.email == account_info ["email"]), None)
+            existing_account = accounts.get(account_info ["email"])
+            account = existing_account
             if existing_account:
                 reply = QMessageBox.question(
                     self,
@@ -248,72 +332,69 @@ class MainWindow(QMainWindow):
                     QMessageBox.Yes | QMessageBox.No,
                     QMessageBox.No)
                 if reply == QMessageBox.Yes:
-                    existing_account.username = account_info ["username"]
-                    existing_account.sso_cookie = account_info ["sso_cookie"]
+                    accounts.update(existing_account,
+                                    username=account_info ["username"],
+                                    sso_cookie=account_info ["sso_cookie"])
                     self.log(f"Updated existing account: {account_info ['email']}")
                 else:
                     self.log(f"Account not added: {account_info ['email']}(already exists)")
                     return
             else:
-                new_account = Account(
+                account = Account(
                     account_info ["email"],
                     account_info ["username"],
+                    "",
                     account_info ["sso_cookie"],
-                    account_info ["password"],
-                    "")
-                accounts.append(new_account)
+                    account_info ["password"])
+                accounts.add(account)
                 self.log(f"Added new account: {account_info ['email']}")
 
-            existing_cred = next((cred for cred in login_credentials if cred.email == account_info ["email"]), None)
-            if existing_cred:
-                existing_cred.password = account_info ["password"]
-            else:
-                login_credentials.append(LoginCredentials(account_info ["email"], account_info ["password"]))
-            
-            self.update_account_list()
+            login_credentials.upsert(account_info ["email"], account_info ["password"])
+
+            self.account_model.account_changed(account)
             self.save_accounts()
             self.save_login_credentials()
     
     def save_login_credentials(self):
-        cred_data = [{"email": cred.email, "password": cred.password} for cred in login_credentials]
-        with open(LOGIN_CREDENTIALS_FILE_NAME, "w") as f:
-            json.dump(cred_data, f, indent=2)
-        self.log("Login credentials saved successfully.")
+        changed = self.store.save_login_credentials(login_credentials)
+        self.log(f"Login credentials saved successfully ({changed} changed).")
+
+    def migrate_json_files(self):
+        try:
+            summary = self.store.migrate_from_json(config)
+        except (OSError, ValueError) as e:
+            self.log(f"Error migrating JSON files to {ACCOUNTS_DB_FILE_NAME}: {str(e)}")
+            return
+        if summary:
+            self.log(f"Migrated {summary['accounts']} accounts and {summary['credentials']} login credentials "
+                     f"from {ACCOUNTS_FILE_NAME}/{LOGIN_CREDENTIALS_FILE_NAME}/{CONFIG_FILE_NAME} "
+                     f"to {ACCOUNTS_DB_FILE_NAME}")
+
+    def prune_status_history(self):
+        removed = self.history.prune(config.history_retention_days, config.history_compact_after_days)
+        if removed:
+            self.log(f"Pruned {removed} old status history records")
 
     def load_config(self):
         try:
-            with open(CONFIG_FILE_NAME, "r") as f:
-                config_data = json.load(f)
-                config.ez_captcha_key = config_data.get("ez_captcha_key", "")
-                config.login_site_key = config_data.get("login_site_key", LOGIN_SITE_KEY)
-                config.status_site_key = config_data.get("status_site_key", STATUS_SITE_KEY)
-                config.login_url = config_data.get("login_url", LOGIN_URL)
-                config.page_url = config_data.get("page_url", SUPPORT_URL)
-                config.extra_options_mode = config_data.get("extra_options_mode", False)
-            self.log("Config loaded successfully")
-        except FileNotFoundError:
-            self.log(f"Config file {CONFIG_FILE_NAME} not found. Using default values.")
-        except json.JSONDecodeError:
-            self.log(f"Error parsing {CONFIG_FILE_NAME}. Using default values.")
+            if self.store.load_config(config):
+                self.log("Config loaded successfully")
+            else:
+                self.log(f"No saved config in {ACCOUNTS_DB_FILE_NAME}. Using default values.")
+        except (sqlite3.Error, ValueError) as e:
+            self.log(f"Error loading config: {str(e)}. Using default values.")
 
     def save_config(self):
-        config_data = {
-            "ez_captcha_key":  config.ez_captcha_key,
-            "login_site_key":  config.login_site_key,
-            "status_site_key": config.status_site_key,
-            "login_url": config.login_url,
-            "page_url": config.page_url,
-            "extra_options_mode": config.extra_options_mode,
-        }
-        with open(CONFIG_FILE_NAME, "w") as f:
-            json.dump(config_data, f, indent = 2)
+        self.store.save_config(config)
         self.log("Config saved successfully")
     
+    def selected_email(self):
+        return self.account_model.email_at(self.account_list.currentIndex())
+
     def edit_selected_account(self):
-        selected_item = self.account_list.currentItem()
-        if selected_item:
-            email = selected_item.text()
-            account = next((acc for acc in accounts if acc.email == email), None)
+        email = self.selected_email()
+        if email:
+            account = accounts.get(email)
             if account:
                 dialog = AddAccountDialog()
                 dialog.email_input.setText(account.email)
@@ -323,11 +404,12 @@ class MainWindow(QMainWindow):
                 dialog.sso_cookie_input.setText(account.sso_cookie)
                 if dialog.exec_():
                     account_info = dialog.get_account_info()
-                    account.password = account_info["password"]
-                    account.username = account_info["username"]
-                    account.sso_cookie = account_info["sso_cookie"]
+                    accounts.update(account,
+                                    password=account_info["password"],
+                                    username=account_info["username"],
+                                    sso_cookie=account_info["sso_cookie"])
                     self.save_accounts()
-                    self.update_account_list()
+                    self.account_model.account_changed(account)
                     self.log(f"Account updated: {account.email}")
             else:
                 self.log("Selected account not found.")
@@ -339,9 +421,11 @@ class MainWindow(QMainWindow):
             self, "Save Log", "", "Text Files(*.txt);;All Files(*)"
         )
         if file_name:
-            with open(file_name, "w") as f:
-                f.write(self.log_text.toPlainText())
-            self.log(f"Log saved to {file_name}")
+            try:
+                count = self.log_pipeline.save(file_name)
+                self.log(f"Log saved to {file_name} ({count} lines)")
+            except OSError as e:
+                self.log(f"Error saving log: {str(e)}")
 
     def refresh_accounts(self):
         self.load_accounts()
@@ -359,10 +443,8 @@ class MainWindow(QMainWindow):
         self.setEnabled(not busy)
 
     def log(self, message):
-        timestamp = time.strftime("%Y-%m-%d %H:%M")
-        log_message = f"[{timestamp}] {message}"
-        self.log_text.append(log_message)
-        print(log_message)
+        # Called directly from worker threads too; the log timer moves messages into the widget in batches
+        self.log_pipeline.write(message)
     
     def check_api_key(self):
         self.log(f"EZ-Captcha API Key Set: {bool(config.ez_captcha_key)}")
@@ -382,15 +464,11 @@ class MainWindow(QMainWindow):
             self.log("No API Key entered")
 
     def get_ez_captcha_balance(self):
-        payload = {"clientKey": config.ez_captcha_key}
         try:
-            response = requests.post(EZ_CAPTCHA_BALANCE_URL, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("errorId", 0) != 0:
-                self.log(f"API error: {data.get('errorDescription', 'Unknown error')}")
-                return None
-            return f"{data.get('balance', 0):.2f}"
+            return f"{captcha_solver.get_balance():.2f}"
+        except CaptchaError as e:
+            self.log(str(e))
+            return None
         except requests.RequestException as e:
             self.log(f"HTTP error checking balance: {str(e)}")
             return None
@@ -412,78 +490,141 @@ class MainWindow(QMainWindow):
     def load_login_credentials(self):
         login_credentials.clear()
         try:
-            with open(LOGIN_CREDENTIALS_FILE_NAME, "r") as f:
-                cred_data = json.load(f)
-                for cred in cred_data:
-                    login_credentials.append(
-                        LoginCredentials(cred["email"], cred["password"])
-                    )
+            for cred in self.store.load_login_credentials():
+                login_credentials.add(cred)
             self.log(f"Loaded {len(login_credentials)} login credentials")
-        except FileNotFoundError:
-            self.log(f"Login credentials file {LOGIN_CREDENTIALS_FILE_NAME} not found.")
-        except json.JSONDecodeError:
-            self.log(f"Error parsing {LOGIN_CREDENTIALS_FILE_NAME}.")
+        except sqlite3.Error as e:
+            self.log(f"Error loading login credentials: {str(e)}")
     
     def load_credentials_from_file(self):
-        file_name, _ = QFileDialog.getOpenFileName(self, "Load Credentials", "", "JSON Files (*.json);;All Files (*)")
-        if file_name:
-            try:
-                with open(file_name, 'r') as f:
-                    cred_data = json.load(f)
-                accounts_updated = 0
-                accounts_added = 0
-                for cred in cred_data:
-                    email = cred.get('email')
-                    password = cred.get('password')
-                    if email and password:
-                        existing_account = next((acc for acc in accounts if acc.email == email), None)
-                        if existing_account:
-                            existing_account.password = password
-                            accounts_updated += 1
-                        else:
-                            new_account = Account(email, "", "", "", password)
-                            accounts.append(new_account)
-                            accounts_added += 1
-                        existing_cred = next((cred for cred in login_credentials if cred.email == email), None)
-                        if existing_cred:
-                            existing_cred.password = password
-                        else:
-                            login_credentials.append(LoginCredentials(email, password))
-                self.save_accounts()
-                self.save_login_credentials()
-                self.update_account_list()
-                self.log(f"Loaded credentials from file: {accounts_updated} updated, {accounts_added} added")
-                QMessageBox.information(self, "Credentials Loaded", f"Updated {accounts_updated} accounts\nAdded {accounts_added} new accounts")
-            except json.JSONDecodeError:
-                self.log("Error: The selected file is not a valid JSON file.")
-                QMessageBox.warning(self, "Error", "The selected file is not a valid JSON file.")
-            except Exception as e:
-                self.log(f"Error loading credentials: {str(e)}")
-                QMessageBox.warning(self, "Error", f"An error occurred while loading credentials: {str(e)}")
+        file_name, _ = QFileDialog.getOpenFileName(self, "Load Credentials", "",
+                                                   "Credential Files (*.json *.jsonl *.csv *.txt);;All Files (*)")
+        if not file_name:
+            return
+        self.persister.flush()
+        importer = CredentialImporter(self.store, accounts, login_credentials, config.import_batch_size)
+        self.import_thread = ImportCredentialsThread(importer, file_name)
+        self.import_thread.log_message.connect(self.log, Qt.DirectConnection)
+        self.import_thread.finished.connect(self.on_import_finished)
+        self.progress_dialog = self.show_progress_dialog("Loading Credentials", cancellable=True)
+        self.import_thread.progress_updated.connect(self.update_progress)
+        self.progress_dialog.canceled.connect(self.import_thread.cancel)
+        self.import_thread.start()
+
+    def on_import_finished(self):
+        if hasattr(self, "progress_dialog"):
+            self.progress_dialog.close()
+        self.update_account_list()
+        summary = self.import_thread.summary
+        if summary is None:
+            QMessageBox.warning(self, "Error", f"An error occurred while loading credentials: {self.import_thread.error}")
+            return
+        for line, reason, email in summary.samples:
+            self.log(f"Rejected entry {line}: {reason}" + (f" ({email})" if email else ""))
+        message = (f"Added {summary.added} new accounts\nUpdated {summary.updated} accounts\n"
+                   f"Unchanged {summary.unchanged}\nRejected {summary.rejected}")
+        if summary.error:
+            QMessageBox.warning(self, "Credentials Partly Loaded", f"{message}\n\nStopped early: {summary.error}")
+        else:
+            QMessageBox.information(self, "Credentials Loaded", message)
+
+    def export_accounts(self):
+        dialog = ExportDialog()
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        file_name, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Accounts", "accounts.csv", "CSV Files (*.csv);;JSON Lines (*.jsonl);;Parquet Files (*.parquet)")
+        if not file_name:
+            return
+        if not os.path.splitext(file_name)[1]:
+            file_name += {"JSON Lines (*.jsonl)": ".jsonl", "Parquet Files (*.parquet)": ".parquet"}.get(
+                selected_filter, ".csv")
+        try:
+            file_format = resolve_export_format(file_name, detect_export_format(file_name))
+            check_output_path(file_name)
+        except ExportError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        # The export reads the database, so everything in memory is written first
+        self.save_accounts()
+        exporter = AccountExporter(self.store, dialog.get_filter(config.cookie_expiry_warning),
+                                   include_secrets=dialog.include_secrets_input.isChecked())
+        self.export_thread = ExportAccountsThread(exporter, file_name, file_format)
+        self.export_thread.log_message.connect(self.log, Qt.DirectConnection)
+        self.export_thread.finished.connect(self.on_export_finished)
+        self.progress_dialog = self.show_progress_dialog("Exporting Accounts", cancellable=True)
+        self.export_thread.progress_updated.connect(self.update_progress)
+        self.progress_dialog.canceled.connect(self.export_thread.cancel)
+        self.export_thread.start()
+
+    def on_export_finished(self):
+        if hasattr(self, "progress_dialog"):
+            self.progress_dialog.close()
+        summary = self.export_thread.summary
+        if summary is None:
+            QMessageBox.warning(self, "Error", f"An error occurred while exporting accounts: {self.export_thread.error}")
+        elif not summary.cancelled:
+            QMessageBox.information(self, "Accounts Exported",
+                                    f"Exported {summary.exported} of {summary.total} accounts to\n{self.export_thread.file_name}")
+
+    def start_run(self, kind, emails, label):
+        previous = self.journal.unfinished(kind)
+        resume_run_id = None
+        if previous and previous["done"]:
+            reply = QMessageBox.question(
+                self, "Resume Interrupted Run",
+                f"The last {label} run stopped after {previous['done']} of {previous['total']} accounts.\n"
+                f"Resume it and skip the accounts that are already done?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if reply == QMessageBox.Yes:
+                resume_run_id = previous["run_id"]
+        return self.journal.start(kind, emails, resume_run_id)
+
+    def scheduled_check_emails(self):
+        if not config.scheduled_checks:
+            return accounts.emails()
+        plan = CheckScheduler(config).plan(accounts)
+        self.log(plan.summary())
+        for account in plan.unusable:
+            self.log(f"{account.email}: not scheduled, SSO cookie is missing or unusable; log in again")
+        if not plan.due:
+            unusable = f" and {len(plan.unusable)} have no usable SSO cookie" if plan.unusable else ""
+            reply = QMessageBox.question(
+                self, "Nothing Due",
+                f"{len(plan.fresh)} accounts were checked recently enough{unusable}. Check all of them anyway?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            return accounts.emails() if reply == QMessageBox.Yes else []
+        return [account.email for account in plan.due]
 
     def run_check_accounts(self):
+        emails = self.scheduled_check_emails()
+        if not emails:
+            return
         self.log("Starting account status check...")
-        self.progress_dialog = self.show_progress_dialog("Checking Accounts")
-        self.progress_dialog.setMaximum(len(accounts))
-        self.check_accounts_thread = CheckAccountsThread(accounts, config)
-        self.check_accounts_thread.log_message.connect(self.log)
+        # Progress is reported in percent; cancelling keeps the journal so the run can be resumed later
+        self.progress_dialog = self.show_progress_dialog("Checking Accounts", cancellable=True)
+        run = self.start_run("check", emails, "account check")
+        self.check_accounts_thread = CheckAccountsThread(accounts, config, emails, history=self.history, http=http_pool, profiles=self.profiles, solver=captcha_solver,
+                                                         persister=self.persister, journal=self.journal, run=run)
+        self.check_accounts_thread.log_message.connect(self.log, Qt.DirectConnection)
         self.check_accounts_thread.progress_updated.connect(self.update_progress)
         self.check_accounts_thread.finished.connect(self.on_check_accounts_finished)
-        self.check_accounts_thread.accounts_updated.connect(self.save_accounts)
+        self.check_accounts_thread.account_updated.connect(self.account_model.account_changed)
         self.check_accounts_thread.start()
         self.progress_dialog.canceled.connect(self.check_accounts_thread.cancel)
         
     def check_selected_account(self):
-        selected_item = self.account_list.currentItem()
-        if selected_item:
-            email = selected_item.text()
-            account = next((acc for acc in accounts if acc.email == email), None)
+        email = self.selected_email()
+        if email:
+            account = accounts.get(email)
             if account:
                 self.progress_dialog = self.show_progress_dialog("Checking Account")
-                self.check_accounts_thread = CheckAccountsThread([account], config)
-                self.check_accounts_thread.log_message.connect(self.log)
+                self.check_accounts_thread = CheckAccountsThread(accounts, config, [email], history=self.history, http=http_pool, profiles=self.profiles, solver=captcha_solver,
+                                                                 persister=self.persister)
+                self.check_accounts_thread.log_message.connect(self.log, Qt.DirectConnection)
                 self.check_accounts_thread.progress_updated.connect(self.update_single_account_progress)
                 self.check_accounts_thread.finished.connect(self.on_single_account_check_finished)
+                self.check_accounts_thread.account_updated.connect(self.account_model.account_changed)
                 self.check_accounts_thread.start()
             else:
                 self.log("No account selected or account not found.")
@@ -498,86 +639,83 @@ class MainWindow(QMainWindow):
         if hasattr(self, "progress_dialog"):
             self.progress_dialog.close()
         self.log("Single account check completed.")
-        self.update_account_list()
         self.save_accounts()
 
     def delete_selected_account(self):
-        selected_item = self.account_list.currentItem()
-        if selected_item:
-            email = selected_item.text()
+        email = self.selected_email()
+        if email:
             reply = QMessageBox.question(self, 'Confirm Deletion',
                                           f"Are you sure you want to delete the account: {email}?",
                                           QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             if reply == QMessageBox.Yes:
-                account = next((acc for acc in accounts if acc.email == email), None)
+                account = accounts.remove(email)
                 if account:
-                    accounts.remove(account)
-                    self.update_account_list()
+                    self.account_model.account_removed(email)
                     self.save_accounts()
                     self.log(f"Account {email} deleted.")
 
     def update_account_list(self):
-        self.account_list.clear()
-        for account in accounts:
-            self.account_list.addItem(account.email)
+        self.account_model.warning_seconds = config.cookie_expiry_warning
+        self.account_model.reset()
 
     def validate_sso_cookies(self):
         self.log("Starting SSO cookie validation...")
-        self.progress_dialog = self.show_progress_dialog("Validating SSO Cookies")
-        self.progress_dialog.setMaximum(len(accounts))
-        for i, account in enumerate(accounts):
-            if self.progress_dialog.wasCanceled():
-                break
-            self.progress_dialog.setValue(i)
-            is_valid = self.validate_sso_cookie(account.sso_cookie)
-            status = "Valid" if is_valid else "Invalid"
-            self.log(f"{account.email}: SSO Cookie is {status}")
-            if not is_valid:
-                account.sso_cookie = ""
-        self.progress_dialog.setValue(len(accounts))
-        self.save_accounts()
-        self.load_accounts()
-        self.update_account_list()
-        self.log("SSO cookie validation completed.")
+        triage = CookieTriage(accounts, config.cookie_expiry_warning)
+        self.log(triage.summary())
+        self.triage_results = {}
+        for state, account in triage.doomed():
+            self.log(f"{account.email}: SSO Cookie is Invalid ({state}, not sent)")
+            self.triage_results[account.email] = False
+        for account in triage.groups[COOKIE_EXPIRING_SOON]:
+            self.log(f"{account.email}: SSO Cookie expires within {config.cookie_expiry_warning // 3600} hours")
+        to_validate = triage.checkable()
+        validator = CookieValidator(self.profiles, config.validation_concurrency)
+        self.validate_thread = ValidateCookiesThread(to_validate, validator)
+        self.validate_thread.log_message.connect(self.log, Qt.DirectConnection)
+        self.validate_thread.finished.connect(self.on_validate_finished)
+        if to_validate:
+            self.progress_dialog = self.show_progress_dialog("Validating SSO Cookies", cancellable=True)
+            self.progress_dialog.setMaximum(len(to_validate))
+            self.validate_thread.progress_updated.connect(self.update_progress)
+            self.progress_dialog.canceled.connect(self.validate_thread.cancel)
+        self.validate_thread.start()
 
-    def validate_sso_cookie(self, sso_cookie):
-        url = "https://support.activision.com/api/profile"
-        headers = {"Cookie": f"ACT_SSO_COOKIE={sso_cookie}"}
-        try:
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                content = response.text
-                if content.strip():  # Check if the response body is not empty
-                    return True
-                else:
-                    self.log(f"SSO cookie expired or invalid (empty response)")
-                    return False
-            elif response.status_code == 401:
-                self.log(f"SSO cookie invalid (401 Unauthorized)")
-                return False
-            else:
-                self.log(f"Unexpected status code: {response.status_code}")
-                return False
-        except requests.RequestException as e:
-            self.log(f"Error during SSO cookie validation: {str(e)}")
-            return False
+    def on_validate_finished(self):
+        results = dict(self.triage_results)
+        results.update(self.validate_thread.results)
+        invalid = 0
+        for email, is_valid in results.items():
+            account = accounts.get(email)
+            if account and not is_valid:
+                accounts.update(account, sso_cookie="")
+                self.account_model.account_changed(account)
+                invalid += 1
+        if self.validate_thread.validator.is_cancelled:
+            self.log("SSO cookie validation cancelled.")
+        if hasattr(self, "progress_dialog"):
+            self.progress_dialog.close()
+        self.save_accounts()
+        self.log(f"SSO cookie validation completed: {len(results) - invalid} valid, {invalid} invalid.")
 
-    def show_progress_dialog(self, title):
+    def show_progress_dialog(self, title, cancellable=False):
         progress_dialog = QProgressDialog(self)
         progress_dialog.setWindowTitle(title)
         progress_dialog.setRange(0, 100)
-        progress_dialog.setCancelButton(None)
+        if not cancellable:
+            progress_dialog.setCancelButton(None)
         progress_dialog.setWindowModality(Qt.WindowModal)
         return progress_dialog
 
     def on_check_accounts_finished(self):
         if hasattr(self, "progress_dialog"):
             self.progress_dialog.close()
-        self.log("Account checking completed.")
+        if self.check_accounts_thread.engine.is_cancelled:
+            self.log("Account checking cancelled; the next check offers to resume it.")
+        else:
+            self.log("Account checking completed.")
     
-    def display_account_details(self, item):
-        email = item.text()
-        account = next((acc for acc in accounts if acc.email == email), None)
+    def display_account_details(self, index):
+        account = accounts.get(self.account_model.email_at(index))
         if account:
             details = []
             details.append(f"Email: {account.email}")
@@ -593,48 +731,72 @@ class MainWindow(QMainWindow):
                 details.append(f"Last Checked: {account.last_check_time}")
             if account.account_age:
                 details.append(f"Account Age: {account.account_age}")
-            linked_accounts = []
-            if hasattr(account, 'psn_id') and account.psn_id:
-                linked_accounts.append(f"- psn: {account.psn_id}")
-            if hasattr(account, 'xbl_id') and account.xbl_id:
-                linked_accounts.append(f"- xbl: {account.xbl_id}")
-            if hasattr(account, 'steam_id') and account.steam_id:
-                linked_accounts.append(f"- steam: {account.steam_id}")
-            if hasattr(account, 'battle_id') and account.battle_id:
-                linked_accounts.append(f"- battle: {account.battle_id}")
+            linked_accounts = [f"- {provider}: {getattr(account, field)}"
+                               for provider, field in PROVIDER_FIELDS.items() if getattr(account, field)]
             if linked_accounts:
                 details.append("\nLinked Accounts:")
                 details.extend(linked_accounts)
-            if hasattr(account, 'bans') and account.bans:
+            if account.bans:
                 details.append("\nBan Information:")
                 for ban in account.bans:
-                    ban_info = f"- {ban.get('title', 'Unknown Game')}: {ban.get('enforcement', 'Unknown')}"
-                    if 'bar' in ban:
-                        ban_info += f" (Appeal Status: {ban['bar'].get('Status', 'Unknown')})"
+                    ban_info = f"- {ban.title or 'Unknown Game'}: {ban.enforcement or 'Unknown'}"
+                    if ban.appeal_status:
+                        ban_info += f" (Appeal Status: {ban.appeal_status})"
                     details.append(ban_info)
             self.account_details.setText("\n".join(details))
         else:
             self.account_details.setText("No account selected or account not found.")
-        if account and hasattr(account, 'cookie_error') and account.cookie_error:
+        if account and account.cookie_error:
             self.log(f"Cookie Error for {account.email}: {account.cookie_error}")
 
     def login_and_update_sso(self):
         self.log("Starting login process...")
-        self.progress_dialog = self.show_progress_dialog("Logging In")
-        self.progress_dialog.setMaximum(len(login_credentials))
-        self.login_thread = LoginThread(login_credentials, accounts, config, self.save_accounts)
+        # Progress is reported in percent; cancelling keeps the journal so the run can be resumed later
+        self.progress_dialog = self.show_progress_dialog("Logging In", cancellable=True)
+        run = self.start_run("login", [cred.email for cred in login_credentials], "login")
+        self.login_thread = LoginThread(login_credentials, accounts, config, self.persister, http_pool, self.profiles, captcha_solver,
+                                        self.journal, run)
         self.login_thread.progress_updated.connect(self.update_progress)
-        self.login_thread.log_message.connect(self.log)
+        self.login_thread.log_message.connect(self.log, Qt.DirectConnection)
         self.login_thread.finished.connect(self.on_login_finished)
         self.login_thread.start()
         self.progress_dialog.canceled.connect(self.login_thread.cancel)
 
+    def toggle_monitor(self):
+        if hasattr(self, "monitor_thread"):
+            self.monitor_btn.setEnabled(False)
+            self.monitor_btn.setText("Stopping Monitor...")
+            self.monitor_thread.cancel()
+            return
+        if not self.check_api_key():
+            QMessageBox.warning(self, "Error", "Set the EZ-Captcha API key before starting the monitor.")
+            return
+        self.monitor_thread = MonitorThread(accounts, config, self.history, http_pool, self.profiles, captcha_solver,
+                                            self.persister)
+        self.monitor_thread.log_message.connect(self.log, Qt.DirectConnection)
+        self.monitor_thread.account_updated.connect(self.account_model.account_changed)
+        self.monitor_thread.status_changed.connect(self.on_monitor_status_changed)
+        self.monitor_thread.finished.connect(self.on_monitor_finished)
+        self.monitor_thread.start()
+        self.monitor_btn.setText("Stop Monitor")
+
+    def on_monitor_status_changed(self, message):
+        self.statusBar().showMessage(f"Status changed: {message}")
+
+    def on_monitor_finished(self):
+        del self.monitor_thread
+        self.monitor_btn.setText("Start Monitor")
+        self.monitor_btn.setEnabled(True)
+
     def update_progress(self, value):
         if hasattr(self, "progress_dialog"):
             self.progress_dialog.setValue(value)
     
     def on_login_finished(self):
-        self.log("Login process completed.")
+        if self.login_thread.login.is_cancelled:
+            self.log("Login process cancelled; the next login offers to resume it.")
+        else:
+            self.log("Login process completed.")
         self.save_accounts()
         self.load_accounts()
         self.update_account_list()
@@ -642,398 +804,224 @@ class MainWindow(QMainWindow):
             self.progress_dialog.close()
 
     def save_accounts(self):
-        accounts_data = [
-            {
-                "email": account.email,
-                "username": account.username,
-                "uno_id": account.uno_id,
-                "sso_cookie": account.sso_cookie,
-                "platform": account.platform,
-                "last_status": account.last_status,
-                "last_check_time": account.last_check_time,
-                "account_age": account.account_age
-            }
-            for account in accounts
-        ]
-        with open(ACCOUNTS_FILE_NAME, "w") as f:
-            json.dump(accounts_data, f, indent=2)
-        self.log("Accounts saved successfully.")
+        # Pending background writes go first so they cannot overwrite this save
+        self.persister.flush()
+        changed = self.store.save_accounts(accounts)
+        self.log(f"Accounts saved successfully ({changed} changed).")
 
     def load_accounts(self):
-        global accounts
+        self.persister.flush()
         accounts.clear()
         try:
-            with open(ACCOUNTS_FILE_NAME, "r") as f:
-                accounts_data = json.load(f)
-                for acc_data in accounts_data:
-                    new_account = Account(
-                        acc_data["email"],
-                        acc_data["username"],
-                        acc_data["uno_id"],
-                        acc_data["sso_cookie"],
-                        acc_data.get("password", ""),
-                        acc_data.get("platform", ""),
-                        acc_data.get("last_status", "")
-                    )
-                    new_account.last_check_time = acc_data.get("last_check_time")
-                    new_account.account_age = acc_data.get("account_age", "Unknown")
-                    accounts.append(new_account)
+            for account in self.store.load_accounts():
+                accounts.add(account)
             self.log(f"Loaded {len(accounts)} accounts")
-        except FileNotFoundError:
-            self.log(f"Accounts file {ACCOUNTS_FILE_NAME} not found.")
-        except json.JSONDecodeError:
-            self.log(f"Error parsing {ACCOUNTS_FILE_NAME}.")
+        except sqlite3.Error as e:
+            self.log(f"Error loading accounts: {str(e)}")
 
 class CheckAccountsThread(QThread):
     progress_updated = pyqtSignal(int)
     log_message = pyqtSignal(str)
     finished = pyqtSignal()
-    accounts_updated = pyqtSignal(list)
+    account_updated = pyqtSignal(object)
     
-    def __init__(self, accounts, config):
+    def __init__(self, accounts, config, emails=None, history=None, http=None, profiles=None, solver=None,
+                 persister=None, journal=None, run=None):
         super().__init__()
         self.accounts = accounts
         self.config = config
-        self.is_cancelled = False
+        self.emails = emails
+        self.persister = persister
+        self.journal = journal
+        self.run_record = run
+        http = http or SessionPool(config)
+        self.checker = AccountChecker(
+            accounts, config, http,
+            profiles or ProfileCache(http, ttl=config.profile_cache_ttl, url=config.profile_url),
+            solver or CaptchaSolver(EzCaptchaProvider(http, config)),
+            history, self.log_message.emit)
+        self.engine = CheckEngine(self.checker, config, self.on_result, self.on_progress, self.log_message.emit)
 
     def run(self):
-        for i, account in enumerate(self.accounts):
-            if self.is_cancelled:
-                break
-            self.progress_updated.emit(i * 100 // len(self.accounts))
-            ban_status = self.check_account(account)
-            account.add_status(ban_status)
-            self.log_message.emit(f"{account.email}: {ban_status}")
-            age_status = self.check_account_age(account)
-            account.account_age = age_status
-            self.log_message.emit(f"{account.email} Age: {age_status}")
-            self.accounts_updated.emit(self.accounts)
-            time.sleep(1)
+        if self.emails is None:
+            to_check = list(self.accounts)
+        else:
+            to_check = [acc for acc in map(self.accounts.get, self.emails) if acc]
+        if self.run_record is not None:
+            self.log_message.emit(self.run_record.summary())
+            to_check = self.run_record.pending(to_check)
+        self.engine.run(to_check)
+        if self.run_record is not None:
+            self.persister.flush()
+            self.journal.finish(self.run_record, self.engine.is_cancelled)
+            self.log_message.emit(self.run_record.final_summary(self.engine.completed, self.engine.is_cancelled))
         self.progress_updated.emit(100)
         self.finished.emit()
 
-    def check_account(self, account):
-        captcha_response = self.solve_status_check_captcha()
-        if not captcha_response:
-            return "Failed to solve status check captcha"
-        headers = {
-            "Cookie": f"ACT_SSO_COOKIE={account.sso_cookie}",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",
-        }
-        params = {"g-cc": captcha_response}
-        try:
-            response = requests.get(ACCOUNT_CHECK_URL, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("error"):
-                return f"API error: {data['error']}"
-            account.can_appeal = data.get('canAppeal', False)
-            account.bans = data.get('bans', [])
-            if not account.bans:
-                return "Account not banned"
-            status = self.determine_ban_status(account.bans)
-            profile_response = requests.get(PROFILE_URL, headers=headers)
-            if profile_response.status_code == 200:
-                profile_data = profile_response.json()
-                account.psn_id = next((acc['username'] for acc in profile_data.get('accounts', []) if acc['provider'] == 'psn'), None)
-                account.xbl_id = next((acc['username'] for acc in profile_data.get('accounts', []) if acc['provider'] == 'xbl'), None)
-                account.steam_id = next((acc['username'] for acc in profile_data.get('accounts', []) if acc['provider'] == 'steam'), None)
-                account.battle_id = next((acc['username'] for acc in profile_data.get('accounts', []) if acc['provider'] == 'battle'), None)
-            cookie_status = self.decode_sso_cookie(account.sso_cookie)
-            if "Error decoding cookie" in cookie_status:
-                account.cookie_error = cookie_status
-            else:
-                status += f"\n{cookie_status}"
-            return status
-        except Exception as e:
-            return f"Error: {str(e)}"
-
-    def determine_ban_status(self, bans):
-        if any(ban["enforcement"] == "PERMANENT" for ban in bans):
-            if any(ban.get("bar", {}).get("Status") == "Open" for ban in bans):
-                return "Permanently banned (Appeal Open)"
-            elif any(ban.get("bar", {}).get("Status") == "Closed" for ban in bans):
-                return "Permanently banned (Appeal Denied)"
-            else:
-                return "Permanently banned"
-        elif any(ban["enforcement"] == "UNDER_REVIEW" for ban in bans):
-            return "Shadowbanned"
-        else:
-            return f"Unknown ban status: {bans[0]['enforcement']}"
-    
-    def check_account_age(self, account):
-        headers = {
-            "Cookie": f"ACT_SSO_COOKIE={account.sso_cookie}",
-            "User-Agent": "Mozilla/5.0(Windows NT 10.0; Win64; x64) AppleWebKit/537.36(KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",
-        }
+    def on_result(self, account, ban_status, age_status):
+        if self.persister is not None:
+            checkpoint = self.run_record.checkpoint(account.email) if self.run_record is not None else None
+            self.persister.mark_dirty(account, checkpoint)
+        self.account_updated.emit(account)
+
+    def on_progress(self, completed, total):
+        self.progress_updated.emit(completed * 100 // total)
+
+    def cancel(self):
+        self.engine.cancel()
+
+class ValidateCookiesThread(QThread):
+    progress_updated = pyqtSignal(int)
+    log_message = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, accounts, validator):
+        super().__init__()
+        self.accounts = accounts
+        self.validator = validator
+        self.validator.log = self.log_message.emit
+        self.results = {}
+        self.completed = 0
+
+    def run(self):
+        self.results = self.validator.run(self.accounts, self.on_result)
+        self.finished.emit()
+
+    def on_result(self, account, is_valid):
+        self.completed += 1
+        self.progress_updated.emit(self.completed)
+        self.log_message.emit(f"{account.email}: SSO Cookie is {'Valid' if is_valid else 'Invalid'}")
+
+    def cancel(self):
+        self.validator.cancel()
+
+class ImportCredentialsThread(QThread):
+    progress_updated = pyqtSignal(int)
+    log_message = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, importer, file_name):
+        super().__init__()
+        self.importer = importer
+        self.importer.log = self.log_message.emit
+        self.importer.on_progress = self.on_progress
+        self.file_name = file_name
+        self.summary = None
+        self.error = None
+
+    def run(self):
         try:
-            response = requests.get(PROFILE_URL, headers=headers)
-            response.raise_for_status()
-            profile_data = response.json()
-            created_date = profile_data.get("created")
-            if created_date:
-                created = iso8601.parse_date(created_date)
-                now = datetime.now(timezone.utc)
-                age = now - created
-                years = age.days // 365
-                months =(age.days % 365) // 30
-                days =(age.days % 365) % 30
-                return f"{years} years, {months} months, {days} days"
-            else:
-                return "Unknown"
+            self.summary = self.importer.run(self.file_name)
         except Exception as e:
-            return f"Error: {str(e)}"
+            self.error = str(e)
+            self.log_message.emit(f"Error loading credentials: {str(e)}")
+        self.finished.emit()
 
-    def decode_sso_cookie(self, sso_cookie):
+    def on_progress(self, bytes_read, total_bytes, summary):
+        self.progress_updated.emit(bytes_read * 100 // total_bytes if total_bytes else 100)
+
+    def cancel(self):
+        self.importer.cancel()
+
+class ExportAccountsThread(QThread):
+    progress_updated = pyqtSignal(int)
+    log_message = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, exporter, file_name, file_format):
+        super().__init__()
+        self.exporter = exporter
+        self.exporter.log = self.log_message.emit
+        self.exporter.on_progress = self.on_progress
+        self.file_name = file_name
+        self.file_format = file_format
+        self.summary = None
+        self.error = None
+
+    def run(self):
         try:
-            decoded_cookie = base64.b64decode(sso_cookie).decode('utf-8')
-            parts = decoded_cookie.split(':')
-            if len(parts) != 3:
-                return "Unexpected cookie format"
-            
-            account_id, expiration_timestamp, hash_value = parts
-            expiration_date = datetime.fromtimestamp(int(expiration_timestamp), tz = timezone.utc)
-            now = datetime.now(timezone.utc)
-            time_left = expiration_date - now
-            
-            if time_left.total_seconds() > 0:
-                days_left = time_left.days
-                hours_left = time_left.seconds // 3600
-                minutes_left =(time_left.seconds % 3600) // 60
-                return f"Cookie expires in: {days_left} days, {hours_left} hours, {minutes_left} minutes"
-            else:
-                return "Cookie has expired"
+            self.summary = self.exporter.run(self.file_name, self.file_format)
         except Exception as e:
-            return f"Error decoding cookie: {str(e)}"
-
-    def solve_status_check_captcha(self):
-        create_task_payload = {
-            "clientKey": self.config.ez_captcha_key,
-            "appId": EZ_CAPTCHA_APP_ID,
-            "task": {
-                "type": "ReCaptchaV2TaskProxyless",
-                "websiteURL": self.config.page_url,
-                "websiteKey": self.config.status_site_key,
-                "isInvisible": False,
-            },
-        }
+            self.error = str(e)
+            self.log_message.emit(f"Error exporting accounts: {str(e)}")
+        self.finished.emit()
+
+    def on_progress(self, scanned, total):
+        self.progress_updated.emit(scanned * 100 // total if total else 100)
+
+    def cancel(self):
+        self.exporter.cancel()
+
+class MonitorThread(QThread):
+    log_message = pyqtSignal(str)
+    finished = pyqtSignal()
+    account_updated = pyqtSignal(object)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, accounts, config, history, http, profiles, solver, persister):
+        super().__init__()
+        checker = AccountChecker(accounts, config, http, profiles, solver, history, self.log_message.emit)
+        self.notifier = build_notifier(config, http, self.log_message.emit, [self])
+        self.monitor = StatusMonitor(accounts, checker, config, self.notifier, persister, self.on_result,
+                                     log=self.log_message.emit)
+
+    def run(self):
         try:
-            response = requests.post(EZ_CAPTCHA_API_URL, json=create_task_payload)
-            response.raise_for_status()
-            create_task_result = response.json()
-            if create_task_result.get("errorId") != 0:
-                self.log_message.emit(f"Error creating captcha task: {create_task_result.get('errorDescription')}")
-                return None
-            task_id = create_task_result["taskId"]
-            get_result_payload = {
-                "clientKey": self.config.ez_captcha_key,
-                "taskId": task_id,
-            }
-            start_time = time.time()
-            while time.time() - start_time < CAPTCHA_TIMEOUT:
-                response = requests.post(EZ_CAPTCHA_RESULT_URL, json=get_result_payload)
-                response.raise_for_status()
-                result = response.json()
-                if result.get("status") == "ready":
-                    return result.get("solution", {}).get("gRecaptchaResponse")
-                elif result.get("status") == "processing":
-                    time.sleep(10)
-                else:
-                    self.log_message.emit(f"Unexpected captcha status: {result.get('status')}")
-                    return None
-            self.log_message.emit("Captcha solving timed out")
-        except requests.RequestException as e:
-            self.log_message.emit(f"HTTP error occurred: {e}")
-        except Exception as e:
-            self.log_message.emit(f"Error solving status captcha: {str(e)}")
-        return None
+            self.monitor.run()
+        finally:
+            self.notifier.close()
+        self.finished.emit()
+
+    def send(self, transitions):
+        # Notification sink: one status bar update per batch
+        self.status_changed.emit(", ".join(str(transition) for transition in transitions))
+
+    def on_result(self, account, ban_status, age_status):
+        self.account_updated.emit(account)
 
     def cancel(self):
-        self.is_cancelled = True
-        
+        self.monitor.stop()
+
 class LoginThread(QThread):
     log_message = pyqtSignal(str)
     finished = pyqtSignal()
     progress_updated = pyqtSignal(int)
 
-    def __init__(self, login_credentials, accounts, config, save_accounts_func):
+    def __init__(self, login_credentials, accounts, config, persister, http=None, profiles=None,
+                 solver=None, journal=None, run=None):
         super().__init__()
-        self.login_credentials = login_credentials
-        self.accounts = accounts
-        self.config = config
-        self.save_accounts = save_accounts_func
-        self.is_cancelled = False
+        self.persister = persister
+        self.journal = journal
+        self.run_record = run
+        # Chrome and selenium take most of the import time and are only needed once a login starts
+        from login import AccountLogin
 
-        self.DRIVER = "chromedriver/chromedriver.exe"
-        self.CHROME = "chrome/chrome.exe"
+        http = http or SessionPool(config)
+        self.login = AccountLogin(
+            login_credentials, accounts, config, http,
+            profiles, solver or CaptchaSolver(EzCaptchaProvider(http, config)),
+            persister.mark_dirty, run=run, on_progress=self.on_progress, log=self.log_message.emit)
 
     def run(self):
-        total_accounts = len(self.login_credentials)
-        for i, cred in enumerate(self.login_credentials):
-            if self.is_cancelled:
-                break
-            self.progress_updated.emit(i * 100 // total_accounts)
-            try:
-                self.log_message.emit(f"Logging in for account: {cred.email}")
-                success, account_info = self.perform_login(cred)
-                if success:
-                    self.update_account(account_info)
-                    self.save_accounts()
-                    self.log_message.emit(f"Successfully logged in and updated info for {cred.email}")
-                else:
-                    self.log_message.emit(f"Failed to log in for {cred.email}")
-            except Exception as e:
-                self.log_message.emit(f"Error processing account {cred.email}: {str(e)}")
-            finally:
-                progress = int((i + 1) / total_accounts * 100)
-                self.progress_updated.emit(progress)
+        self.progress_updated.emit(0)
+        self.login.run()
+        if self.run_record is not None:
+            self.persister.flush()
+            self.journal.finish(self.run_record, self.login.is_cancelled)
+            self.log_message.emit(self.run_record.final_summary(self.login.succeeded, self.login.is_cancelled))
         self.finished.emit()
 
+    def on_progress(self, completed, total):
+        self.progress_updated.emit(completed * 100 // total)
+
     def cancel(self):
-        self.is_cancelled = True
-
-    def perform_login(self, cred):
-        options = uc.ChromeOptions()
-        options.binary_location = self.CHROME
-        if self.config.extra_options_mode:
-            options.add_argument('--start-minimized')
-            #options.add_argument('--enable-fast-unload')
-            #options.add_argument('--disable-gpu')
-            #options.add_argument('--enable-precache')
-            #options.add_argument('--allow-cross-origin-auth-prompt')
-            #options.add_argument('--disable-low-res-tiling')
-            #options.add_argument('--no-sandbox')
-            #options.add_argument('--enable-automation')
-            #options.add_argument('--disable-blink-features=AutomationControlled')
-            #options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=200,100')
-        driver = None
-        try:
-            driver = uc.Chrome(options=options, driver_executable_path=self.DRIVER)
-            driver.get(SUPPORT_URL)
-            login_link = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".log-in-link"))
-            )
-            login_link.click()
-            WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.ID, "username")))
-            driver.find_element(By.ID, "username").send_keys(cred.email)
-            driver.find_element(By.ID, "password").send_keys(cred.password)
-            captcha_response = self.solve_login_captcha()
-            if not captcha_response:
-                self.log_message.emit("Failed to solve captcha")
-                return False, None
-            driver.execute_script(
-                f"""
-                document.getElementById('g-recaptcha-response').innerHTML = '{captcha_response}';
-                grecaptcha.getResponse = function() {{ return '{captcha_response}'; }};
-            """
-            )
-            login_button = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.ID, "login-button")))
-            login_button.click()
-            WebDriverWait(driver, LOGIN_TIMEOUT).until(EC.url_contains("support.activision.com"))
-            sso_cookie = self.get_sso_cookie(driver)
-            if not sso_cookie:
-                self.log_message.emit("Failed to retrieve SSO cookie")
-                return False, None
-            profile_data = self.get_profile_data(driver)
-            return True, self.extract_account_info(profile_data, sso_cookie)
-        except Exception as e:
-            self.log_message.emit(f"An error occurred during login: {str(e)}")
-            return False, None
-        finally:
-            if driver:
-                driver.quit()
-    def get_sso_cookie(self, driver):
-        all_cookies = driver.get_cookies()
-        return next(
-           (
-                cookie["value"]
-                for cookie in all_cookies
-                if cookie["name"] == "ACT_SSO_COOKIE"
-            ),
-            None,
-        )
-    def get_profile_data(self, driver):
-        driver.get(PROFILE_URL)
-        return json.loads(driver.find_element(By.TAG_NAME, "body").text)
-    
-    def extract_account_info(self, profile_data, sso_cookie):
-        username = profile_data.get("username")
-        email = profile_data.get("email")
-        uno_account = next(
-            (
-                acc
-                for acc in profile_data.get("accounts", [])
-                if acc.get("provider") == "uno"
-            ),
-            None,
-        )
-        uno_id = uno_account.get("username") if uno_account else None
-        return {
-            "email": email,
-            "username": username,
-            "uno_id": uno_id,
-            "sso_cookie": sso_cookie,
-        }
-    def update_account(self, account_info):
-        existing_account = next((acc for acc in self.accounts if acc.email == account_info["email"]), None)
-        if existing_account:
-            existing_account.username = account_info["username"]
-            existing_account.uno_id = account_info["uno_id"]
-            existing_account.sso_cookie = account_info["sso_cookie"]
-        else:
-            new_account = Account(
-                account_info["email"],
-                account_info["username"],
-                account_info["sso_cookie"],
-                "",
-                ""
-            )
-            self.accounts.append(new_account)
-
-    def solve_login_captcha(self):
-        create_task_payload = {
-            "clientKey": self.config.ez_captcha_key,
-            "appid": EZ_CAPTCHA_APP_ID,
-            "task": {
-                "type": "ReCaptchaV2TaskProxyless",
-                "websiteURL": self.config.login_url,
-                "websiteKey": self.config.login_site_key,
-                "isInvisible": False,
-            },
-        }
-        try:
-            response = requests.post(EZ_CAPTCHA_API_URL, json=create_task_payload)
-            response.raise_for_status()
-            create_task_result = response.json()
-            if create_task_result.get("errorId") != 0:
-                return None
-            task_id = create_task_result["taskId"]
-            get_result_payload = {
-                "clientKey": self.config.ez_captcha_key,
-                "taskId": task_id,
-            }
-            start_time = time.time()
-            while time.time() - start_time < CAPTCHA_TIMEOUT:
-                response = requests.post(EZ_CAPTCHA_RESULT_URL, json=get_result_payload)
-                response.raise_for_status()
-                result = response.json()
-                if result.get("status") == "ready":
-                    return result.get("solution", {}).get("gRecaptchaResponse")
-                elif result.get("status") == "processing":
-                    time.sleep(10)
-                else:
-                    return None
-            self.log_message.emit("Captcha solving timed out")
-        except requests.RequestException as e:
-            self.log_message.emit(f"HTTP error occurred: {e}")
-        except Exception as e:
-            self.log_message.emit(f"Error solving captcha: {str(e)}")
-        return None
+        self.login.cancel()
 
 config = Config()
-accounts = []
-login_credentials = []
+http_pool = SessionPool(config)
+captcha_solver = CaptchaSolver(EzCaptchaProvider(http_pool, config))
+accounts = AccountRegistry()
+login_credentials = CredentialRegistry()
 
 def main():
     app = QApplication(sys.argv)
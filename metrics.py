@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds; fixed buckets keep memory flat no matter how many observations arrive
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 20, 30, 60, 120, float("inf"))
+
+PHASE_CAPTCHA_CREATE = "captcha_create"
+PHASE_CAPTCHA_POLL = "captcha_poll"
+PHASE_CAPTCHA_SOLVE = "captcha_solve"
+PHASE_BAN_API = "ban_api"
+PHASE_PROFILE_API = "profile_api"
+PHASE_CHECK = "check"
+PHASE_CHROME_LAUNCH = "chrome_launch"
+PHASE_LOGIN = "login"
+
+
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, counts=None, total=0.0, count=0):
+        self.counts = list(counts) if counts is not None else [0] * len(PHASE_BUCKETS)
+        self.total = total
+        self.count = count
+
+    def observe(self, value):
+        self.counts[bisect_left(PHASE_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def copy(self):
+        return Histogram(self.counts, self.total, self.count)
+
+    def minus(self, earlier):
+        if earlier is None:
+            return self.copy()
+        return Histogram([a - b for a, b in zip(self.counts, earlier.counts)], self.total - earlier.total,
+                         self.count - earlier.count)
+
+    def quantile(self, q):
+        # Interpolated inside the bucket the rank falls in, like Prometheus' histogram_quantile
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = PHASE_BUCKETS[i - 1] if i else 0.0
+                upper = PHASE_BUCKETS[i]
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return PHASE_BUCKETS[-2]
+
+
+class MetricsSnapshot:
+    def __init__(self, counters, histograms):
+        self.counters = counters
+        self.histograms = histograms
+
+
+class Metrics:
+    def __init__(self, prefix="codstatus"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self._histograms.get(phase)
+            if histogram is None:
+                histogram = self._histograms[phase] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def snapshot(self):
+        with self._lock:
+            return MetricsSnapshot(dict(self._counters),
+                                   {phase: histogram.copy() for phase, histogram in self._histograms.items()})
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def since(self, earlier=None):
+        current = self.snapshot()
+        if earlier is None:
+            return current
+        counters = {key: value - earlier.counters.get(key, 0) for key, value in current.counters.items()}
+        histograms = {phase: histogram.minus(earlier.histograms.get(phase))
+                      for phase, histogram in current.histograms.items()}
+        return MetricsSnapshot({key: value for key, value in counters.items() if value},
+                               {phase: histogram for phase, histogram in histograms.items() if histogram.count})
+
+    def phase_quantiles(self, earlier=None):
+        return {phase: {"count": histogram.count, "p50": round(histogram.quantile(0.5), 3),
+                        "p95": round(histogram.quantile(0.95), 3), "p99": round(histogram.quantile(0.99), 3)}
+                for phase, histogram in self.since(earlier).histograms.items()}
+
+    def summary(self, earlier=None):
+        # earlier: a snapshot taken when the run started, so the summary covers only that run
+        delta = self.since(earlier)
+        lines = []
+        for phase, histogram in sorted(delta.histograms.items()):
+            lines.append(f"{phase}: {histogram.count} x, mean {histogram.total / histogram.count:.2f}s, "
+                         f"p50 {histogram.quantile(0.5):.2f}s, p95 {histogram.quantile(0.95):.2f}s, "
+                         f"p99 {histogram.quantile(0.99):.2f}s")
+        totals = {}
+        for (name, labels), value in sorted(delta.counters.items()):
+            label_text = ",".join(f"{label}={label_value}" for label, label_value in labels)
+            totals.setdefault(name, []).append(f"{label_text} {value}" if label_text else str(value))
+        for name, values in totals.items():
+            lines.append(f"{name}: {', '.join(values)}")
+        if not lines:
+            return "Metrics: nothing recorded"
+        return "Metrics:\n  " + "\n  ".join(lines)
+
+    def render(self):
+        snapshot = self.snapshot()
+        lines = []
+        names = sorted({name for name, _ in snapshot.counters})
+        for name in names:
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(snapshot.counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{format_labels(labels)} {value}")
+        if snapshot.histograms:
+            metric = f"{self.prefix}_phase_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for phase, histogram in sorted(snapshot.histograms.items()):
+                phase_label = (("phase", phase),)
+                cumulative = 0
+                for bound, bucket_count in zip(PHASE_BUCKETS, histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{metric}_bucket{format_labels(phase_label, (('le', le),))} {cumulative}")
+                lines.append(f"{metric}_sum{format_labels(phase_label)} {histogram.total:.6f}")
+                lines.append(f"{metric}_count{format_labels(phase_label)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class MetricsExporter:
+    def __init__(self, metrics, path="", interval=15, port=0, log=print):
+        # path: Prometheus text file rewritten every interval seconds; port: serve /metrics on localhost
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.log = log
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        if path:
+            self._thread = threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True)
+            self._thread.start()
+        if port:
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+                threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+            except OSError as e:
+                self.log(f"Error starting metrics endpoint on port {port}: {str(e)}")
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return MetricsHandler
+
+    def write(self):
+        # Written next to the target and renamed, so a scraper never reads a half-written file
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.log(f"Error writing metrics to {self.path}: {str(e)}")
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,103 @@
+import sys
+import time
+from datetime import datetime
+
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class BanEntry:
+    # Enforcement, game title and appeal status repeat across the whole fleet, so each is stored once
+    __slots__ = ("enforcement", "title", "appeal_status")
+
+    def __init__(self, enforcement, title=None, appeal_status=None):
+        self.enforcement = intern_text(enforcement)
+        self.title = intern_text(title)
+        self.appeal_status = intern_text(appeal_status)
+
+    @classmethod
+    def from_api(cls, ban):
+        return cls(ban.get("enforcement"), ban.get("title"), (ban.get("bar") or {}).get("Status"))
+
+    def to_list(self):
+        return [self.enforcement, self.title, self.appeal_status]
+
+    def to_dict(self):
+        return {"enforcement": self.enforcement, "title": self.title, "appeal_status": self.appeal_status}
+
+
+class Account:
+    __slots__ = (
+        "email", "username", "uno_id", "sso_cookie", "password", "platform", "last_status", "checked_at",
+        "account_age", "psn_id", "xbl_id", "steam_id", "battle_id", "bans", "ban_flags", "appeal", "can_appeal",
+        "cookie_error",
+    )
+
+    def __init__(self, email, username, uno_id, sso_cookie, password="", platform="", last_status=""):
+        self.email = email
+        self.username = username
+        self.uno_id = uno_id
+        self.sso_cookie = sso_cookie
+        self.password = password
+        self.platform = intern_text(platform)
+        self.last_status = last_status
+        # Epoch seconds; last_check_time is the ISO text kept in the database and shown to the user
+        self.checked_at = None
+        self.account_age = "Unknown"
+        self.psn_id = None
+        self.xbl_id = None
+        self.steam_id = None
+        self.battle_id = None
+        self.bans = ()
+        # Derived from bans when a check parses them; see parsing.apply_bans
+        self.ban_flags = 0
+        self.appeal = APPEAL_NONE
+        self.can_appeal = False
+        self.cookie_error = None
+
+    @property
+    def last_check_time(self):
+        if self.checked_at is None:
+            return None
+        return datetime.fromtimestamp(self.checked_at).isoformat()
+
+    @last_check_time.setter
+    def last_check_time(self, value):
+        if value is None or isinstance(value, int):
+            self.checked_at = value
+            return
+        try:
+            self.checked_at = int(datetime.fromisoformat(value).timestamp())
+        except (TypeError, ValueError):
+            self.checked_at = None
+
+    def add_status(self, status):
+        self.last_status = status
+        self.checked_at = int(time.time())
+
+    def update_status(self, status):
+        self.last_status = status
+        self.checked_at = int(time.time())
+
+
+class LoginCredentials:
+    def __init__(self, email, password):
+        self.email = email
+        self.password = password
+
+
+BAN_PERMANENT = 1
+BAN_UNDER_REVIEW = 2
+BAN_OTHER = 4
+CAN_APPEAL = 8
+
+APPEAL_NONE = 0
+APPEAL_OPEN = 1
+APPEAL_CLOSED = 2
+
+CHECK_FAILURE_PREFIXES = ("Failed", "API error", "Error")
+
+
+def is_failed_status(status):
+    return status.startswith(CHECK_FAILURE_PREFIXES)
@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+from collections import deque
+
+from engine import CheckEngine
+from models import is_failed_status
+from scheduler import REASON_NO_COOKIE, CheckScheduler
+
+
+def status_key(status):
+    return (status or "").partition("\n")[0]
+
+
+class StatusTransition:
+    __slots__ = ("email", "previous", "current", "at")
+
+    def __init__(self, email, previous, current, at=None):
+        self.email = email
+        self.previous = previous
+        self.current = current
+        self.at = time.time() if at is None else at
+
+    def to_dict(self):
+        return {"email": self.email, "previous": self.previous, "current": self.current, "at": int(self.at)}
+
+    def __str__(self):
+        return f"{self.email}: {self.previous} -> {self.current}"
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, transitions):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for transition in transitions:
+                f.write(json.dumps(transition.to_dict()) + "\n")
+
+
+class WebhookSink:
+    def __init__(self, url, http):
+        self.url = url
+        self.http = http
+
+    def send(self, transitions):
+        response = self.http.post(self.url, json={"transitions": [t.to_dict() for t in transitions]})
+        response.raise_for_status()
+
+
+class LogSink:
+    def __init__(self, log):
+        self.log = log
+
+    def send(self, transitions):
+        for transition in transitions:
+            self.log(f"Status changed: {transition}")
+
+
+class NotificationBatcher:
+    def __init__(self, sinks, batch_size, max_delay, max_pending=1000, log=print):
+        # Sinks run on one background thread; a sink that keeps failing only ever holds max_pending transitions
+        self.sinks = sinks
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.log = log
+        self._cond = threading.Condition()
+        self._pending = deque(maxlen=max_pending)
+        self._oldest = None
+        self._closed = False
+        self.sent = 0
+        self.failures = 0
+        self._thread = threading.Thread(target=self._send_loop, name="notifications", daemon=True)
+        self._thread.start()
+
+    def publish(self, transition):
+        with self._cond:
+            self._pending.append(transition)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _due(self):
+        if self._closed or len(self._pending) >= self.batch_size:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = None if self._oldest is None else self.max_delay - (time.monotonic() - self._oldest)
+                    self._cond.wait(timeout)
+                batch = list(self._pending)
+                self._pending.clear()
+                self._oldest = None
+                closing = self._closed
+            if batch:
+                for sink in self.sinks:
+                    try:
+                        sink.send(batch)
+                    except Exception as e:
+                        self.failures += 1
+                        self.log(f"Error sending {len(batch)} notifications to {type(sink).__name__}: {str(e)}")
+                self.sent += len(batch)
+            if closing:
+                return
+
+
+def build_notifier(config, http, log=print, extra_sinks=()):
+    sinks = [LogSink(log), *extra_sinks]
+    if config.monitor_notify_file:
+        sinks.append(FileSink(config.monitor_notify_file))
+    if config.monitor_webhook_url:
+        sinks.append(WebhookSink(config.monitor_webhook_url, http))
+    return NotificationBatcher(sinks, config.notify_batch_size, config.notify_max_delay, log=log)
+
+
+class StatusMonitor:
+    def __init__(self, accounts, checker, config, notifier, persister=None, on_result=None, max_cycles=None,
+                 log=print):
+        self.accounts = accounts
+        self.checker = checker
+        self.config = config
+        self.notifier = notifier
+        self.persister = persister
+        self.on_result = on_result
+        self.max_cycles = max_cycles
+        self.log = log
+        self._stop = threading.Event()
+        self._engine = None
+        # Last successful status per account; bounded by the account list, pruned every cycle
+        self._last_known = {}
+        self.cycles = 0
+        self.checked = 0
+        self.transitions = 0
+
+    def stop(self):
+        self._stop.set()
+        engine = self._engine
+        if engine is not None:
+            engine.cancel()
+
+    @property
+    def is_stopped(self):
+        return self._stop.is_set()
+
+    def run(self):
+        self.log("Monitor started")
+        while not self.is_stopped:
+            # Accounts without a usable cookie are never due; they wait for a login instead of spinning the loop
+            due = CheckScheduler(self.config).plan(self.accounts).due
+            if due:
+                self.run_cycle(due)
+            else:
+                self._stop.wait(self.idle_seconds())
+        self.log(f"Monitor stopped after {self.cycles} cycles: {self.checked} checks, "
+                 f"{self.transitions} status changes")
+
+    def idle_seconds(self):
+        # Sleep until the next account falls due, but wake up regularly to pick up added accounts
+        scheduler = CheckScheduler(self.config)
+        next_due = None
+        for account in self.accounts:
+            reason, due_at = scheduler.classify(account)
+            if reason != REASON_NO_COOKIE and (next_due is None or due_at < next_due):
+                next_due = due_at
+        wait = self.config.monitor_idle_sleep if next_due is None else next_due - scheduler.now
+        return max(1, min(wait, self.config.monitor_idle_sleep))
+
+    def run_cycle(self, due):
+        started = time.monotonic()
+        present = set(self.accounts.emails())
+        for email in [email for email in self._last_known if email not in present]:
+            del self._last_known[email]
+        for account in due:
+            self._last_known.setdefault(account.email, status_key(account.last_status))
+        changes_before = self.transitions
+        self._engine = CheckEngine(self.checker, self.config, self.handle_result, log=self.log)
+        if self.is_stopped:
+            return
+        self._engine.run(due)
+        self.cycles += 1
+        if self.max_cycles is not None and self.cycles >= self.max_cycles:
+            self._stop.set()
+        self.checked += self._engine.completed
+        self.log(f"Monitor cycle {self.cycles}: {self._engine.completed} checked, "
+                 f"{self.transitions - changes_before} status changes in {time.monotonic() - started:.0f}s")
+        self._engine = None
+
+    def handle_result(self, account, ban_status, age_status):
+        if self.persister is not None:
+            self.persister.mark_dirty(account)
+        current = status_key(ban_status)
+        if not is_failed_status(current):
+            previous = self._last_known.get(account.email)
+            self._last_known[account.email] = current
+            if previous and previous != current and not is_failed_status(previous):
+                self.transitions += 1
+                self.notifier.publish(StatusTransition(account.email, previous, current))
+        if self.on_result is not None:
+            self.on_result(account, ban_status, age_status)
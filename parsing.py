@@ -0,0 +1,90 @@
+from models import (
+    APPEAL_CLOSED, APPEAL_NONE, APPEAL_OPEN, BAN_OTHER, BAN_PERMANENT, BAN_UNDER_REVIEW, CAN_APPEAL, BanEntry
+)
+
+# Profile provider -> Account attribute holding that platform's ID
+PROVIDER_FIELDS = {"psn": "psn_id", "xbl": "xbl_id", "steam": "steam_id", "battle": "battle_id"}
+
+
+class ProfileRecord:
+    __slots__ = ("username", "email", "created", "ids")
+
+    def __init__(self, username, email, created, ids):
+        self.username = username
+        self.email = email
+        self.created = created
+        self.ids = ids
+
+    @property
+    def uno_id(self):
+        return self.ids.get("uno")
+
+
+class BanRecord:
+    __slots__ = ("bans", "flags", "appeal", "first_enforcement")
+
+    def __init__(self, bans, flags, appeal, first_enforcement):
+        self.bans = bans
+        self.flags = flags
+        self.appeal = appeal
+        self.first_enforcement = first_enforcement
+
+    def status(self):
+        if not self.bans:
+            return "Account not banned"
+        if self.flags & BAN_PERMANENT:
+            if self.appeal == APPEAL_OPEN:
+                return "Permanently banned (Appeal Open)"
+            if self.appeal == APPEAL_CLOSED:
+                return "Permanently banned (Appeal Denied)"
+            return "Permanently banned"
+        if self.flags & BAN_UNDER_REVIEW:
+            return "Shadowbanned"
+        return f"Unknown ban status: {self.first_enforcement}"
+
+
+def parse_profile(data):
+    ids = {}
+    for linked in data.get("accounts") or ():
+        provider = linked.get("provider")
+        # The first entry per provider wins, as the API lists the primary link first
+        if provider and provider not in ids:
+            ids[provider] = linked.get("username")
+    return ProfileRecord(data.get("username"), data.get("email"), data.get("created"), ids)
+
+
+def summarize_bans(bans, can_appeal=False):
+    # -> (flags, appeal) for a sequence of BanEntry
+    flags = CAN_APPEAL if can_appeal else 0
+    appeal = APPEAL_NONE
+    for ban in bans:
+        if ban.enforcement == "PERMANENT":
+            flags |= BAN_PERMANENT
+        elif ban.enforcement == "UNDER_REVIEW":
+            flags |= BAN_UNDER_REVIEW
+        else:
+            flags |= BAN_OTHER
+        if ban.appeal_status == "Open":
+            appeal = APPEAL_OPEN
+        elif ban.appeal_status == "Closed" and appeal != APPEAL_OPEN:
+            appeal = APPEAL_CLOSED
+    return flags, appeal
+
+
+def parse_bans(data):
+    # Raw ban dicts are dropped here; only the compact entries are kept on the account
+    bans = tuple(BanEntry.from_api(ban) for ban in data.get("bans") or ())
+    flags, appeal = summarize_bans(bans, data.get("canAppeal"))
+    return BanRecord(bans, flags, appeal, bans[0].enforcement if bans else None)
+
+
+def apply_profile(account, profile):
+    for provider, field in PROVIDER_FIELDS.items():
+        setattr(account, field, profile.ids.get(provider))
+
+
+def apply_bans(account, record):
+    account.bans = record.bans
+    account.ban_flags = record.flags
+    account.appeal = record.appeal
+    account.can_appeal = bool(record.flags & CAN_APPEAL)
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from history import insert_history
+from settings import PERSIST_BATCH_SIZE, PERSIST_MAX_DELAY
+from store import account_row
+
+
+class AccountPersister:
+    def __init__(self, store, batch_size=PERSIST_BATCH_SIZE, max_delay=PERSIST_MAX_DELAY, journal=None,
+                 log=print):
+        # Workers only snapshot the account and return; a single writer thread does all the disk work
+        self.store = store
+        self.journal = journal
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.log = log
+        self._cond = threading.Condition()
+        self._dirty = {}
+        self._checkpoints = []
+        self._history = []
+        self._oldest = None
+        self._flush_requested = 0
+        self._flushed = 0
+        self._closed = False
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self._writer = threading.Thread(target=self._write_loop, name="account-persister", daemon=True)
+        self._writer.start()
+
+    def mark_dirty(self, account, checkpoint=None, history=None):
+        # checkpoint: a run journal entry, written only once this account's row is on disk
+        # history: a status history entry, written after the account row it references
+        row = account_row(account)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Account persister is closed")
+            self._dirty[row[0]] = row
+            if checkpoint is not None:
+                self._checkpoints.append(checkpoint)
+            if history is not None:
+                self._history.append(history)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._dirty) >= self.batch_size:
+                self._cond.notify_all()
+
+    def discard(self, email):
+        with self._cond:
+            self._dirty.pop(email, None)
+
+    @property
+    def pending(self):
+        with self._cond:
+            return len(self._dirty)
+
+    def flush(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._flush_requested += 1
+            ticket = self._flush_requested
+            self._cond.notify_all()
+            while self._flushed < ticket and self._writer.is_alive():
+                self._cond.wait(0.5)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+
+    def summary(self):
+        return f"Account writes: {self.rows_written} rows in {self.flushes} batches, {self.errors} errors"
+
+    def _due(self):
+        if self._closed or self._flush_requested > self._flushed or len(self._dirty) >= self.batch_size:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = None if self._oldest is None else self.max_delay - (time.monotonic() - self._oldest)
+                    self._cond.wait(timeout)
+                rows = list(self._dirty.values())
+                checkpoints = self._checkpoints
+                history = self._history
+                self._dirty.clear()
+                self._checkpoints = []
+                self._history = []
+                self._oldest = None
+                ticket = self._flush_requested
+                closing = self._closed
+            if rows:
+                try:
+                    self.rows_written += self.store.save_rows(rows)
+                    self.flushes += 1
+                    if checkpoints and self.journal is not None:
+                        self.journal.append(checkpoints)
+                    checkpoints = []
+                    if history:
+                        with self.store.transaction() as conn:
+                            insert_history(conn, history)
+                        history = []
+                except Exception as e:
+                    self.errors += 1
+                    self.log(f"Error saving {len(rows)} accounts: {str(e)}")
+                    with self._cond:
+                        # Keep the rows for the next attempt unless a newer snapshot arrived meanwhile
+                        for row in rows:
+                            self._dirty.setdefault(row[0], row)
+                        self._checkpoints[:0] = checkpoints
+                        self._history[:0] = history
+                        if self._oldest is None:
+                            self._oldest = time.monotonic()
+            with self._cond:
+                self._flushed = max(self._flushed, ticket)
+                self._cond.notify_all()
+            if closing:
+                return
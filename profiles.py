@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+import time
+
+from metrics import METRICS, PHASE_PROFILE_API
+from settings import PROFILE_URL, USER_AGENT, PROFILE_CACHE_TTL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_cache (
+    email TEXT PRIMARY KEY,
+    cookie_hash TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    profile TEXT NOT NULL
+)
+"""
+
+
+class ProfileError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def cookie_hash(sso_cookie):
+    return hashlib.sha256((sso_cookie or "").encode("utf-8")).hexdigest()[:32]
+
+
+def compact_profile(profile_data):
+    return {
+        "username": profile_data.get("username"),
+        "email": profile_data.get("email"),
+        "created": profile_data.get("created"),
+        "accounts": [
+            {"provider": acc.get("provider"), "username": acc.get("username")}
+            for acc in profile_data.get("accounts", [])
+        ],
+    }
+
+
+class ProfileCache:
+    def __init__(self, http, store=None, ttl=PROFILE_CACHE_TTL, url=PROFILE_URL):
+        self.http = http
+        self.url = url
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        if store is not None:
+            with store.transaction() as conn:
+                conn.execute(SCHEMA)
+
+    def get(self, email, sso_cookie, force=False):
+        # force skips a cached entry and refetches, so a cookie revoked on the server is not reported as valid
+        fingerprint = cookie_hash(sso_cookie)
+        entry = self._lookup(email)
+        if not force and entry and entry[0] == fingerprint and time.time() - entry[1] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return entry[2]
+        with self._lock:
+            self.misses += 1
+        headers = {
+            "Cookie": f"ACT_SSO_COOKIE={sso_cookie}",
+            "User-Agent": USER_AGENT,
+        }
+        with METRICS.timer(PHASE_PROFILE_API):
+            response = self.http.get(self.url, headers=headers)
+        if response.status_code != 200 or not response.text.strip():
+            # A cached profile for a cookie the server rejects must not keep answering later checks
+            if entry is not None:
+                self.invalidate(email)
+            if response.status_code != 200:
+                raise ProfileError(f"Unexpected status code: {response.status_code}", response.status_code)
+            raise ProfileError("Empty profile response", response.status_code)
+        profile = compact_profile(response.json())
+        self.put(email, sso_cookie, profile)
+        return profile
+
+    def put(self, email, sso_cookie, profile_data):
+        profile = compact_profile(profile_data)
+        entry = (cookie_hash(sso_cookie), int(time.time()), profile)
+        with self._lock:
+            self._entries[email] = entry
+        if self.store is not None:
+            with self.store.transaction() as conn:
+                conn.execute("INSERT OR REPLACE INTO profile_cache (email, cookie_hash, fetched_at, profile) "
+                             "VALUES (?, ?, ?, ?)", (email, entry[0], entry[1], json.dumps(profile)))
+        return profile
+
+    def invalidate(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+        if self.store is not None:
+            with self.store.transaction() as conn:
+                conn.execute("DELETE FROM profile_cache WHERE email = ?", (email,))
+
+    def prune(self):
+        if self.store is None:
+            return 0
+        cutoff = int(time.time()) - self.ttl
+        with self.store.transaction() as conn:
+            return conn.execute(
+                "DELETE FROM profile_cache WHERE fetched_at < ? OR email NOT IN (SELECT email FROM accounts)",
+                (cutoff,)).rowcount
+
+    def _lookup(self, email):
+        with self._lock:
+            entry = self._entries.get(email)
+        if entry is not None or self.store is None:
+            return entry
+        with self.store.transaction() as conn:
+            row = conn.execute("SELECT cookie_hash, fetched_at, profile FROM profile_cache WHERE email = ?",
+                               (email,)).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], row[1], json.loads(row[2]))
+        with self._lock:
+            self._entries[email] = entry
+        return entry
@@ -0,0 +1,148 @@
+import threading
+
+from models import LoginCredentials
+
+PLATFORM_ID_FIELDS = ("psn_id", "xbl_id", "steam_id", "battle_id")
+
+
+class AccountRegistry:
+    def __init__(self, accounts=()):
+        self._lock = threading.RLock()
+        self._by_email = {}
+        self._by_uno_id = {}
+        self._by_platform_id = {field: {} for field in PLATFORM_ID_FIELDS}
+        # email -> (uno_id, {field: value}) as last indexed, so stale keys can be dropped
+        self._indexed_keys = {}
+        for account in accounts:
+            self.add(account)
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_email.values()))
+
+    def __contains__(self, email):
+        return email in self._by_email
+
+    def emails(self):
+        with self._lock:
+            return list(self._by_email)
+
+    def get(self, email):
+        return self._by_email.get(email)
+
+    def find_by_uno_id(self, uno_id):
+        return self._by_uno_id.get(uno_id)
+
+    def find_by_platform_id(self, field, value):
+        return self._by_platform_id[field].get(value)
+
+    def add(self, account):
+        with self._lock:
+            existing = self._by_email.get(account.email)
+            if existing is not None and existing is not account:
+                self._unindex(existing)
+            self._by_email[account.email] = account
+            self._index(account)
+            return account
+
+    def remove(self, account_or_email):
+        with self._lock:
+            email = getattr(account_or_email, "email", account_or_email)
+            account = self._by_email.pop(email, None)
+            if account is not None:
+                self._unindex(account)
+            return account
+
+    def clear(self):
+        with self._lock:
+            self._by_email.clear()
+            self._by_uno_id.clear()
+            for index in self._by_platform_id.values():
+                index.clear()
+            self._indexed_keys.clear()
+
+    def update(self, account, **fields):
+        with self._lock:
+            old_email = account.email
+            for name, value in fields.items():
+                setattr(account, name, value)
+            if account.email != old_email:
+                self._unindex(account, old_email)
+                self._by_email.pop(old_email, None)
+                self._by_email[account.email] = account
+            self._index(account)
+            return account
+
+    def reindex(self, account):
+        with self._lock:
+            if self._by_email.get(account.email) is account:
+                self._index(account)
+
+    def _index(self, account):
+        self._unindex(account)
+        platform_ids = {}
+        if account.uno_id:
+            self._by_uno_id[account.uno_id] = account
+        for field in PLATFORM_ID_FIELDS:
+            value = getattr(account, field, None)
+            if value:
+                self._by_platform_id[field][value] = account
+                platform_ids[field] = value
+        self._indexed_keys[account.email] = (account.uno_id, platform_ids)
+
+    def _unindex(self, account, email=None):
+        keys = self._indexed_keys.pop(email or account.email, None)
+        if keys is None:
+            return
+        uno_id, platform_ids = keys
+        if uno_id and self._by_uno_id.get(uno_id) is account:
+            del self._by_uno_id[uno_id]
+        for field, value in platform_ids.items():
+            if self._by_platform_id[field].get(value) is account:
+                del self._by_platform_id[field][value]
+
+
+class CredentialRegistry:
+    def __init__(self, credentials=()):
+        self._lock = threading.RLock()
+        self._by_email = {}
+        for cred in credentials:
+            self.add(cred)
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_email.values()))
+
+    def __contains__(self, email):
+        return email in self._by_email
+
+    def get(self, email):
+        return self._by_email.get(email)
+
+    def add(self, cred):
+        with self._lock:
+            self._by_email[cred.email] = cred
+            return cred
+
+    def upsert(self, email, password):
+        with self._lock:
+            cred = self._by_email.get(email)
+            if cred:
+                cred.password = password
+            else:
+                cred = self._by_email[email] = LoginCredentials(email, password)
+            return cred
+
+    def remove(self, email):
+        with self._lock:
+            return self._by_email.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._by_email.clear()
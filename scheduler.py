@@ -0,0 +1,77 @@
+import time
+
+from cookies import DOOMED_COOKIE_STATES, classify_sso_cookie
+from models import is_failed_status
+
+REASON_NEVER_CHECKED = "never checked"
+REASON_FAILED = "last check failed"
+REASON_COOKIE_EXPIRING = "cookie expires before next check"
+REASON_STALE = "stale"
+REASON_FRESH = "fresh"
+REASON_NO_COOKIE = "cookie unusable"
+
+# Lower sorts first: accounts never checked, then ones whose cookie is about to run out, then most overdue
+PRIORITY = {REASON_NEVER_CHECKED: 0, REASON_COOKIE_EXPIRING: 1, REASON_FAILED: 2, REASON_STALE: 3}
+
+
+class SchedulePlan:
+    def __init__(self):
+        self.due = []
+        self.fresh = []
+        self.unusable = []
+        self.reasons = {}
+
+    def summary(self):
+        counts = ", ".join(f"{count} {reason}" for reason, count in sorted(self.reasons.items()))
+        return (f"Scheduler: {len(self.due)} accounts due, {len(self.fresh)} still fresh, "
+                f"{len(self.unusable)} without a usable SSO cookie ({counts})")
+
+
+class CheckScheduler:
+    def __init__(self, config, now=None):
+        self.intervals = config.check_intervals
+        self.default_interval = config.default_check_interval
+        self.retry_interval = config.failed_check_retry
+        self.warning_seconds = config.cookie_expiry_warning
+        self.now = time.time() if now is None else now
+
+    def interval_for(self, status):
+        status = (status or "").partition("\n")[0]
+        if is_failed_status(status):
+            return self.retry_interval
+        return self.intervals.get(status, self.default_interval)
+
+    def classify(self, account):
+        # -> (reason, due_at)
+        cookie_state, cookie_expires_at = classify_sso_cookie(account.sso_cookie, self.warning_seconds, self.now)
+        if cookie_state in DOOMED_COOKIE_STATES:
+            # Nothing to gain from spending a captcha; the plan lists these apart from the due accounts
+            return REASON_NO_COOKIE, self.now
+        checked_at = account.checked_at
+        if checked_at is None:
+            return REASON_NEVER_CHECKED, 0
+        due_at = checked_at + self.interval_for(account.last_status)
+        if is_failed_status(account.last_status or ""):
+            return (REASON_FAILED if due_at <= self.now else REASON_FRESH), due_at
+        if due_at <= self.now:
+            return REASON_STALE, due_at
+        if cookie_expires_at < due_at and self.now - checked_at >= self.retry_interval:
+            return REASON_COOKIE_EXPIRING, cookie_expires_at
+        return REASON_FRESH, due_at
+
+    def plan(self, accounts):
+        plan = SchedulePlan()
+        due = []
+        for account in accounts:
+            reason, due_at = self.classify(account)
+            plan.reasons[reason] = plan.reasons.get(reason, 0) + 1
+            if reason == REASON_FRESH:
+                plan.fresh.append(account)
+            elif reason == REASON_NO_COOKIE:
+                # Never queued: a check would only be skipped by triage; these need a login instead
+                plan.unusable.append(account)
+            else:
+                due.append((PRIORITY[reason], due_at, account))
+        due.sort(key=lambda item: (item[0], item[1]))
+        plan.due = [account for _, _, account in due]
+        return plan
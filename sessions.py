@@ -0,0 +1,178 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import METRICS
+
+
+class _NoCookiesPolicy(DefaultCookiePolicy):
+    # Sessions are shared between accounts; the SSO cookie is always sent explicitly per request
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.per_host = {}
+
+    def _host(self, host):
+        return self.per_host.setdefault(host, {"requests": 0, "errors": 0, "connections_opened": 0})
+
+    def request_sent(self, host):
+        with self._lock:
+            self.requests += 1
+            self._host(host)["requests"] += 1
+
+    def request_failed(self, host):
+        with self._lock:
+            self.errors += 1
+            self._host(host)["errors"] += 1
+
+    def connection_opened(self, host):
+        with self._lock:
+            self.connections_opened += 1
+            self._host(host)["connections_opened"] += 1
+
+    @property
+    def reuse_rate(self):
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.connections_opened / self.requests)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "connections_opened": self.connections_opened,
+                "reuse_rate": round(self.reuse_rate, 3),
+                "per_host": {host: dict(counts) for host, counts in self.per_host.items()},
+            }
+
+    def summary(self):
+        return (f"HTTP pool: {self.requests} requests, {self.connections_opened} connections opened, "
+                f"{self.reuse_rate:.0%} reused, {self.errors} errors")
+
+
+def _counting_pool_classes(stats):
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            stats.connection_opened(self.host)
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            stats.connection_opened(self.host)
+            return super()._new_conn()
+
+    return {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+
+class RequestThrottle:
+    def __init__(self, rate, per_host):
+        # rate: requests per second across all hosts (0 disables); per_host: concurrent requests per host
+        self.rate = rate
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._host_slots = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self._lock:
+            semaphore = self._host_slots.get(host)
+            if semaphore is None:
+                semaphore = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+        semaphore.acquire()
+        try:
+            if self.rate:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_slot)
+                    self._next_slot = start + 1 / self.rate
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            semaphore.release()
+
+
+class SessionPool:
+    def __init__(self, config):
+        self.config = config
+        self.stats = PoolStats()
+        self.throttle = None
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def session_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(_NoCookiesPolicy())
+                adapter = _CountingAdapter(
+                    self.stats,
+                    pool_connections=2,
+                    pool_maxsize=self.config.http_pool_maxsize,
+                    pool_block=self.config.http_pool_block,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (self.config.http_connect_timeout, self.config.http_read_timeout))
+        host = urlsplit(url).hostname
+        session = self.session_for(url)
+        with self._lock:
+            if self.throttle is None:
+                self.throttle = RequestThrottle(self.config.request_rate, self.config.per_host_concurrency)
+        with self.throttle.slot(host):
+            self.stats.request_sent(host)
+            METRICS.inc("http_requests", host=host)
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.stats.request_failed(host)
+                METRICS.inc("http_errors", host=host, error=type(e).__name__)
+                raise
+            METRICS.inc("http_responses", host=host, code=response.status_code)
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,134 @@
+# Constants
+#CHROME = os.path.join(os.path.dirname(sys.executable), "chrome", "chrome.exe")
+#DRIVER = os.path.join(os.path.dirname(sys.executable), "chromedriver", "chromedriver.exe")
+CONFIG_FILE_NAME = "config.json"
+ACCOUNTS_FILE_NAME = "accounts.json"
+ACCOUNTS_DB_FILE_NAME = "accounts.db"
+EZ_CAPTCHA_APP_ID = 84291
+CHROME = "chrome/chrome.exe"
+DRIVER = "chromedriver/chromedriver.exe"
+LOGIN_CREDENTIALS_FILE_NAME = "login_credentials.json"
+EZ_CAPTCHA_API_URL = "https://api.ez-captcha.com/createTask"
+EZ_CAPTCHA_RESULT_URL = "https://api.ez-captcha.com/getTaskResult"
+EZ_CAPTCHA_BALANCE_URL = "https://api.ez-captcha.com/getBalance"
+ACCOUNT_CHECK_URL = "https://support.activision.com/api/bans/v2/appeal?locale=en"
+PROFILE_URL = "https://support.activision.com/api/profile"
+LOGIN_URL = "https://s.activision.com/do_login?new_SiteId=activision"
+SUPPORT_URL = "https://support.activision.com"
+LOGIN_SITE_KEY = "6LfjPWwbAAAAAKhf5D1Ag5nIS-QO2M4rX52LcnDt"
+STATUS_SITE_KEY = "6LdB2NUpAAAAANcdcy9YcjBOBD4rY-TIHOeolkkk"
+LOGIN_TIMEOUT = 120
+CAPTCHA_TIMEOUT = 120
+CAPTCHA_LOOKAHEAD = 3
+# Poll schedule used until enough solve times have been observed to learn one
+CAPTCHA_INITIAL_POLL_DELAY = 1
+CAPTCHA_MIN_POLL_INTERVAL = 1
+CAPTCHA_MAX_POLL_INTERVAL = 10
+# reCAPTCHA v2 tokens are accepted for about two minutes after solving
+CAPTCHA_TOKEN_TTL = 110
+HISTORY_RETENTION_DAYS = 365
+HISTORY_COMPACT_AFTER_DAYS = 14
+HTTP_POOL_MAXSIZE = 10
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_READ_TIMEOUT = 30
+PROFILE_CACHE_TTL = 24 * 3600
+COOKIE_EXPIRY_WARNING = 24 * 3600
+VALIDATION_CONCURRENCY = 8
+CHECK_CONCURRENCY = 4
+PER_HOST_CONCURRENCY = 8
+REQUEST_RATE = 20
+BROWSER_POOL_SIZE = 2
+LOG_FILE_NAME = "checker.log.jsonl"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# Lines kept in the log window; older lines scroll out
+LOG_MAX_LINES = 5000
+LOG_FLUSH_INTERVAL_MS = 200
+# Changed accounts are written in one transaction once this many are pending or the oldest is this many seconds old
+PERSIST_BATCH_SIZE = 100
+PERSIST_MAX_DELAY = 2.0
+# Imported credentials are committed this many at a time
+IMPORT_BATCH_SIZE = 1000
+# How long a check result stays fresh, by the first line of the account's last status
+CHECK_INTERVALS = {
+    "Account not banned": 24 * 3600,
+    "Shadowbanned": 3600,
+    "Permanently banned (Appeal Open)": 6 * 3600,
+    "Permanently banned (Appeal Denied)": 7 * 24 * 3600,
+    "Permanently banned": 3 * 24 * 3600,
+}
+DEFAULT_CHECK_INTERVAL = 24 * 3600
+FAILED_CHECK_RETRY = 15 * 60
+BROWSER_MAX_USES = 20
+METRICS_FILE_NAME = "metrics.prom"
+METRICS_INTERVAL = 15
+MONITOR_NOTIFY_FILE_NAME = "transitions.jsonl"
+# Upper bound on how long the monitor sleeps between scheduler passes when nothing is due
+MONITOR_IDLE_SLEEP = 60
+NOTIFY_BATCH_SIZE = 20
+NOTIFY_MAX_DELAY = 5.0
+# Config keys the settings UI edits; other keys are only saved when they differ from the built-in default,
+# so changed defaults still reach existing installs
+USER_CONFIG_KEYS = ("ez_captcha_key", "login_site_key", "status_site_key", "login_url", "page_url", "extra_options_mode")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
+
+
+class Config:
+    def __init__(self, ez_captcha_key="", login_site_key=LOGIN_SITE_KEY, status_site_key=STATUS_SITE_KEY,
+                 login_url=LOGIN_URL, page_url=SUPPORT_URL, account_check_url=ACCOUNT_CHECK_URL,
+                 profile_url=PROFILE_URL, ez_captcha_api_url=EZ_CAPTCHA_API_URL,
+                 ez_captcha_result_url=EZ_CAPTCHA_RESULT_URL, ez_captcha_balance_url=EZ_CAPTCHA_BALANCE_URL,
+                 extra_options_mode=False,
+                 history_retention_days=HISTORY_RETENTION_DAYS, history_compact_after_days=HISTORY_COMPACT_AFTER_DAYS,
+                 http_pool_maxsize=HTTP_POOL_MAXSIZE, http_pool_block=False,
+                 http_connect_timeout=HTTP_CONNECT_TIMEOUT, http_read_timeout=HTTP_READ_TIMEOUT,
+                 profile_cache_ttl=PROFILE_CACHE_TTL, captcha_lookahead=CAPTCHA_LOOKAHEAD,
+                 captcha_token_ttl=CAPTCHA_TOKEN_TTL, cookie_expiry_warning=COOKIE_EXPIRY_WARNING,
+                 validation_concurrency=VALIDATION_CONCURRENCY, check_concurrency=CHECK_CONCURRENCY,
+                 per_host_concurrency=PER_HOST_CONCURRENCY, request_rate=REQUEST_RATE,
+                 browser_pool_size=BROWSER_POOL_SIZE, browser_max_uses=BROWSER_MAX_USES,
+                 scheduled_checks=True, check_intervals=None, default_check_interval=DEFAULT_CHECK_INTERVAL,
+                 failed_check_retry=FAILED_CHECK_RETRY, monitor_notify_file=MONITOR_NOTIFY_FILE_NAME,
+                 monitor_webhook_url="", monitor_idle_sleep=MONITOR_IDLE_SLEEP, notify_batch_size=NOTIFY_BATCH_SIZE,
+                 notify_max_delay=NOTIFY_MAX_DELAY, metrics_file=METRICS_FILE_NAME, metrics_interval=METRICS_INTERVAL,
+                 metrics_port=0, import_batch_size=IMPORT_BATCH_SIZE):
+        self.ez_captcha_key = ez_captcha_key
+        self.login_site_key = login_site_key
+        self.status_site_key = status_site_key
+        self.login_url = login_url
+        self.page_url = page_url
+        self.account_check_url = account_check_url
+        self.profile_url = profile_url
+        self.ez_captcha_api_url = ez_captcha_api_url
+        self.ez_captcha_result_url = ez_captcha_result_url
+        self.ez_captcha_balance_url = ez_captcha_balance_url
+        self.extra_options_mode = extra_options_mode
+        self.history_retention_days = history_retention_days
+        self.history_compact_after_days = history_compact_after_days
+        self.http_pool_maxsize = http_pool_maxsize
+        self.http_pool_block = http_pool_block
+        self.http_connect_timeout = http_connect_timeout
+        self.http_read_timeout = http_read_timeout
+        self.profile_cache_ttl = profile_cache_ttl
+        self.captcha_lookahead = captcha_lookahead
+        self.captcha_token_ttl = captcha_token_ttl
+        self.cookie_expiry_warning = cookie_expiry_warning
+        self.validation_concurrency = validation_concurrency
+        self.check_concurrency = check_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.request_rate = request_rate
+        self.browser_pool_size = browser_pool_size
+        self.browser_max_uses = browser_max_uses
+        self.scheduled_checks = scheduled_checks
+        self.check_intervals = dict(CHECK_INTERVALS if check_intervals is None else check_intervals)
+        self.default_check_interval = default_check_interval
+        self.failed_check_retry = failed_check_retry
+        self.monitor_notify_file = monitor_notify_file
+        self.monitor_webhook_url = monitor_webhook_url
+        self.monitor_idle_sleep = monitor_idle_sleep
+        self.notify_batch_size = notify_batch_size
+        self.notify_max_delay = notify_max_delay
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.metrics_port = metrics_port
+        self.import_batch_size = import_batch_size
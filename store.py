@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from models import Account, BanEntry, LoginCredentials
+from parsing import summarize_bans
+from settings import (
+    ACCOUNTS_DB_FILE_NAME, ACCOUNTS_FILE_NAME, CONFIG_FILE_NAME, LOGIN_CREDENTIALS_FILE_NAME, USER_CONFIG_KEYS, Config,
+)
+
+ACCOUNT_COLUMNS = (
+    "email", "username", "uno_id", "sso_cookie", "password", "platform", "last_status",
+    "last_check_time", "account_age", "psn_id", "xbl_id", "steam_id", "battle_id", "can_appeal", "bans",
+)
+# Columns added after the first release, created on open for older databases
+ADDED_ACCOUNT_COLUMNS = (("can_appeal", "INTEGER"), ("bans", "TEXT"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    username TEXT,
+    uno_id TEXT,
+    sso_cookie TEXT,
+    password TEXT,
+    platform TEXT,
+    last_status TEXT,
+    last_check_time TEXT,
+    account_age TEXT,
+    psn_id TEXT,
+    xbl_id TEXT,
+    steam_id TEXT,
+    battle_id TEXT,
+    can_appeal INTEGER,
+    bans TEXT
+);
+CREATE TABLE IF NOT EXISTS login_credentials (
+    email TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_ACCOUNT = "INSERT INTO accounts ({cols}) VALUES ({marks}) ON CONFLICT(email) DO UPDATE SET {updates}".format(
+    cols=", ".join(ACCOUNT_COLUMNS),
+    marks=", ".join("?" for _ in ACCOUNT_COLUMNS),
+    updates=", ".join(f"{col} = excluded.{col}" for col in ACCOUNT_COLUMNS[1:]),
+)
+
+
+def encode_bans(bans):
+    if not bans:
+        return None
+    return json.dumps([ban.to_list() for ban in bans], separators=(",", ":"))
+
+
+def decode_bans(text):
+    if not text:
+        return ()
+    return tuple(BanEntry(*ban) for ban in json.loads(text))
+
+
+def account_row(account):
+    return (
+        account.email, account.username, account.uno_id, account.sso_cookie, account.password, account.platform,
+        account.last_status, account.last_check_time, account.account_age, account.psn_id, account.xbl_id,
+        account.steam_id, account.battle_id, int(account.can_appeal), encode_bans(account.bans),
+    )
+
+
+def row_dict(row):
+    values = dict(zip(ACCOUNT_COLUMNS, row))
+    values["can_appeal"] = bool(values["can_appeal"])
+    values["bans"] = [ban.to_dict() for ban in decode_bans(values["bans"])]
+    return values
+
+
+class AccountStore:
+    def __init__(self, path=ACCOUNTS_DB_FILE_NAME):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(accounts)")}
+        for column, column_type in ADDED_ACCOUNT_COLUMNS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE accounts ADD COLUMN {column} {column_type}")
+        # Last row written per email / credential, so saves only touch what changed
+        self._saved_accounts = {}
+        self._saved_credentials = {}
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def load_accounts(self):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(ACCOUNT_COLUMNS)} FROM accounts ORDER BY id").fetchall()
+            self._saved_accounts = {row[0]: row for row in rows}
+        loaded = []
+        for row in rows:
+            values = dict(zip(ACCOUNT_COLUMNS, row))
+            account = Account(
+                values["email"],
+                values["username"],
+                values["uno_id"],
+                values["sso_cookie"],
+                values["password"] or "",
+                values["platform"] or "",
+                values["last_status"] or "",
+            )
+            account.last_check_time = values["last_check_time"]
+            account.account_age = values["account_age"] or "Unknown"
+            account.psn_id = values["psn_id"]
+            account.xbl_id = values["xbl_id"]
+            account.steam_id = values["steam_id"]
+            account.battle_id = values["battle_id"]
+            account.can_appeal = bool(values["can_appeal"])
+            account.bans = decode_bans(values["bans"])
+            account.ban_flags, account.appeal = summarize_bans(account.bans, account.can_appeal)
+            loaded.append(account)
+        return loaded
+
+    def iter_account_rows(self, fetch_size=1000):
+        # A separate connection reads one consistent snapshot without holding the store lock,
+        # so background writes carry on during a long export
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(ACCOUNT_COLUMNS)} FROM accounts ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def count_accounts(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    def missing_emails(self, emails):
+        with self._lock:
+            known = set()
+            for start in range(0, len(emails), 500):
+                chunk = emails[start:start + 500]
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT email FROM accounts WHERE email IN ({', '.join('?' for _ in chunk)})", chunk))
+        return [email for email in emails if email not in known]
+
+    def is_saved(self, email):
+        return email in self._saved_accounts
+
+    def save_account(self, account):
+        return self.save_accounts([account], prune=False)
+
+    def save_accounts(self, accounts, prune=True):
+        return self.save_rows([account_row(account) for account in accounts], prune)
+
+    def save_rows(self, rows, prune=False):
+        with self._lock:
+            changed = []
+            seen = set()
+            for row in rows:
+                seen.add(row[0])
+                if self._saved_accounts.get(row[0]) != row:
+                    changed.append(row)
+            removed = [email for email in self._saved_accounts if email not in seen] if prune else []
+            if not changed and not removed:
+                return 0
+            with self.transaction() as conn:
+                conn.executemany(_UPSERT_ACCOUNT, changed)
+                conn.executemany("DELETE FROM accounts WHERE email = ?", ((email,) for email in removed))
+            for row in changed:
+                self._saved_accounts[row[0]] = row
+            for email in removed:
+                del self._saved_accounts[email]
+            return len(changed) + len(removed)
+
+    def delete_account(self, email):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM accounts WHERE email = ?", (email,))
+        self._saved_accounts.pop(email, None)
+
+    def load_login_credentials(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT email, password FROM login_credentials ORDER BY rowid").fetchall()
+            self._saved_credentials = dict(rows)
+        return [LoginCredentials(email, password) for email, password in rows]
+
+    def save_login_credentials(self, credentials):
+        with self._lock:
+            current = {cred.email: cred.password for cred in credentials}
+            changed = [(email, password) for email, password in current.items()
+                       if self._saved_credentials.get(email) != password]
+            removed = [email for email in self._saved_credentials if email not in current]
+            if not changed and not removed:
+                return 0
+            with self.transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO login_credentials (email, password) VALUES (?, ?) "
+                    "ON CONFLICT(email) DO UPDATE SET password = excluded.password", changed)
+                conn.executemany("DELETE FROM login_credentials WHERE email = ?", ((email,) for email in removed))
+            self._saved_credentials = current
+            return len(changed) + len(removed)
+
+    def save_rows_and_credentials(self, rows, credential_rows):
+        # credential_rows: (email, password) pairs upserted without touching other credentials.
+        # One transaction, so a failure never leaves accounts without their credentials or the other way round
+        with self._lock:
+            changed = [row for row in rows if self._saved_accounts.get(row[0]) != row]
+            changed_credentials = [(email, password) for email, password in credential_rows
+                                   if self._saved_credentials.get(email) != password]
+            if not changed and not changed_credentials:
+                return 0
+            with self.transaction() as conn:
+                conn.executemany(_UPSERT_ACCOUNT, changed)
+                conn.executemany(
+                    "INSERT INTO login_credentials (email, password) VALUES (?, ?) "
+                    "ON CONFLICT(email) DO UPDATE SET password = excluded.password", changed_credentials)
+            for row in changed:
+                self._saved_accounts[row[0]] = row
+            self._saved_credentials.update(changed_credentials)
+            return len(changed) + len(changed_credentials)
+
+    def load_config(self, config):
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM config").fetchall()
+        for key, value in rows:
+            if hasattr(config, key):
+                setattr(config, key, json.loads(value))
+        return bool(rows)
+
+    def save_config(self, config):
+        defaults = vars(Config())
+        saved = []
+        removed = []
+        for key, value in vars(config).items():
+            if key in USER_CONFIG_KEYS or value != defaults.get(key):
+                saved.append((key, json.dumps(value)))
+            else:
+                removed.append((key,))
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                saved)
+            conn.executemany("DELETE FROM config WHERE key = ?", removed)
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def migrate_from_json(self, config, accounts_file=ACCOUNTS_FILE_NAME,
+                          credentials_file=LOGIN_CREDENTIALS_FILE_NAME, config_file=CONFIG_FILE_NAME):
+        if self.get_meta("json_migrated"):
+            return None
+        summary = {"accounts": 0, "credentials": 0, "config": False}
+        accounts_data = _read_json(accounts_file) or []
+        credentials_data = _read_json(credentials_file) or []
+        config_data = _read_json(config_file) or {}
+        with self.transaction() as conn:
+            try:
+                self._migrate_rows(conn, config, accounts_data, credentials_data, config_data, summary)
+            except (KeyError, TypeError, AttributeError) as e:
+                # Rolled back as a whole, so fixing the file and starting again migrates everything
+                raise ValueError(f"Malformed entry in {accounts_file}, {credentials_file} or {config_file}: "
+                                 f"{type(e).__name__}: {str(e)}") from e
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+        return summary
+
+    def _migrate_rows(self, conn, config, accounts_data, credentials_data, config_data, summary):
+        for acc_data in accounts_data:
+            account = Account(
+                acc_data["email"],
+                acc_data.get("username", ""),
+                acc_data.get("uno_id", ""),
+                acc_data.get("sso_cookie", ""),
+                acc_data.get("password", ""),
+                acc_data.get("platform", ""),
+                acc_data.get("last_status", ""),
+            )
+            account.last_check_time = acc_data.get("last_check_time")
+            account.account_age = acc_data.get("account_age", "Unknown")
+            conn.execute(_UPSERT_ACCOUNT, account_row(account))
+            summary["accounts"] += 1
+        for cred in credentials_data:
+            conn.execute("INSERT OR REPLACE INTO login_credentials (email, password) VALUES (?, ?)",
+                         (cred["email"], cred["password"]))
+            summary["credentials"] += 1
+        for key, value in config_data.items():
+            if hasattr(config, key):
+                conn.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+                summary["config"] = True
+
+
+def _read_json(file_name):
+    if not os.path.exists(file_name):
+        return None
+    with open(file_name, "r") as f:
+        return json.load(f)
@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from profiles import ProfileError
+
+
+class CookieValidator:
+    def __init__(self, profiles, concurrency, log=print):
+        self.profiles = profiles
+        self.concurrency = max(1, concurrency)
+        self.log = log
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def validate(self, account):
+        try:
+            # An explicit validation always asks the server; the refreshed entry is shared with later checks
+            self.profiles.get(account.email, account.sso_cookie, force=True)
+            return True
+        except ProfileError as e:
+            if e.status_code == 200:
+                self.log(f"{account.email}: SSO cookie expired or invalid (empty response)")
+            elif e.status_code == 401:
+                self.log(f"{account.email}: SSO cookie invalid (401 Unauthorized)")
+            else:
+                self.log(f"{account.email}: {str(e)}")
+            return False
+        except (requests.RequestException, ValueError) as e:
+            self.log(f"{account.email}: Error during SSO cookie validation: {str(e)}")
+            return False
+
+    def run(self, accounts, on_result=None):
+        results = {}
+        pending = {}
+        remaining = iter(accounts)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                while not self.is_cancelled and len(pending) < self.concurrency:
+                    account = next(remaining, None)
+                    if account is None:
+                        break
+                    pending[executor.submit(self.validate, account)] = account
+                if not pending:
+                    break
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    account = pending.pop(future)
+                    results[account.email] = future.result()
+                    if on_result is not None:
+                        on_result(account, results[account.email])
+        return results